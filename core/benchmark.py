@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Wizard Fight Headless Benchmark
+Runs the real hand tracking, gesture and display pipeline against a recorded
+video (or synthetic frames) without a camera or window, and reports
+throughput, per-frame latency and the spells committed in each round.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add the parent directory to the path so we can import from core and ui
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.duel_session import DuelSession, HandSpellDetector, simulate
+from core.frame_profiler import FrameProfiler
+from core.gameLogic import get_random_spell, is_counter
+from core.hand_roi import HandRoiTracker
+from core.performance_profiles import load_profiles, get_profile, create_hands
+from core.startup import warm_up_hands
+
+
+class SyntheticFrameSource:
+    """Generates moving test frames in place of a webcam"""
+
+    def __init__(self, width=640, height=480, fps=30.0, frame_count=600):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = frame_count
+        self.index = 0
+        # Precomputed gradient, shifted a little every frame so frames differ
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        self.base = np.dstack([(x + y) / 2, np.broadcast_to(x, (height, width)),
+                               np.broadcast_to(y, (height, width))]).astype(np.uint8)
+
+    def isOpened(self):
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.frame_count
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height
+        return 0
+
+    def read(self):
+        if self.index >= self.frame_count:
+            return False, None
+        frame = np.roll(self.base, self.index * 4, axis=1)
+        self.index += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def open_source(args):
+    """Open the recorded video, or synthetic frames when no video is given"""
+    if args.video:
+        source = cv2.VideoCapture(args.video)
+        if not source.isOpened():
+            print(f"Error: Could not open {args.video}")
+            return None
+        return source
+    return SyntheticFrameSource(args.width, args.height, args.fps, args.frames or 600)
+
+
+def run_benchmark(args, profile_name=None):
+    from ui.game_display import GameDisplay
+
+    source = open_source(args)
+    if source is None:
+        return None
+
+    fps = source.get(cv2.CAP_PROP_FPS) or args.fps
+    # Own generator, so the mage's spells repeat for a seed without touching the global one
+    rng = random.Random(args.seed)
+
+    profile_name, perf_profile = get_profile(profile_name, args.perf_config)
+    hands = create_hands(perf_profile)
+    width = perf_profile.get("inference_width") or 640
+    warm_up_hands(hands, width, width * 3 // 4)  # As the game does before the duel starts
+    hand_tracker = HandRoiTracker.for_profile(hands, perf_profile) if args.roi else hands
+    game_display = None if args.no_display else GameDisplay(frame_width=1920, frame_height=1080)
+    profiler = FrameProfiler(window=1_000_000)
+    detector = HandSpellDetector(hand_tracker, perf_profile, profiler=profiler)
+    session = DuelSession(args.difficulty, detector=detector, display=game_display,
+                          spell_picker=lambda: get_random_spell(rng), log=None)
+
+    rounds = []
+    games = 0
+    frame_index = 0
+    session.start(0.0)
+    start = time.perf_counter()
+
+    while args.frames is None or frame_index < args.frames:
+        profiler.begin_frame()
+        success, img = source.read()
+        profiler.mark("capture")
+        if not success:
+            break
+
+        # The duel follows the source's own clock so runs are repeatable
+        video_time = frame_index / fps
+        session.tick(img, video_time)
+        profiler.mark("gesture")
+
+        if game_display:
+            session.render(img)
+        profiler.mark("compose")
+        profiler.end_frame()
+        frame_index += 1
+
+        if session.finished:
+            # Keep playing duels until the source runs out
+            games += 1
+            rounds.extend(dict(r, game=games) for r in session.rounds)
+            session.restart(video_time)
+
+    elapsed = time.perf_counter() - start
+    source.release()
+    hand_tracker.close()
+    if game_display:
+        game_display.cleanup()
+
+    # Rounds of the duel the source ended in
+    rounds.extend(dict(r, game=games + 1) for r in session.rounds)
+    for r in rounds:
+        r["countered"] = is_counter(r["player_spell"], r["mage_spell"])
+
+    return {
+        "profile": profile_name,
+        "frames": frame_index,
+        "seconds": elapsed,
+        "fps": frame_index / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": profiler.summary(),
+        "games": games,
+        "rounds": rounds,
+    }
+
+
+def print_report(report):
+    print(f"\n[{report['profile']}] Processed {report['frames']} frames in {report['seconds']:.2f}s "
+          f"({report['fps']:.1f} FPS)")
+    print("\nPer-frame latency (ms):")
+    print(f"{'stage':<12}{'p50':>8}{'p95':>8}{'p99':>8}")
+    for stage, (p50, p95, p99) in report["latency_ms"].items():
+        print(f"{stage:<12}{p50:8.2f}{p95:8.2f}{p99:8.2f}")
+    print(f"\nSpells committed per round ({report['games']} duels finished):")
+    for r in report["rounds"]:
+        print(f"  Duel {r['game']} round {r['round']}: mage {r['mage_spell']}, player {r['player_spell']} "
+              f"({'countered' if r['countered'] else 'missed'}) after {r['reaction_seconds']:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Wizard Fight benchmark")
+    parser.add_argument("--video", help="Recorded video to use instead of the webcam (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, help="Stop after this many frames")
+    parser.add_argument("--difficulty", default="medium", choices=["easy", "medium", "hard"])
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the mage's spells")
+    parser.add_argument("--perf-profile", metavar="NAME",
+                        help="Performance profile to run, or 'all' to compare every profile (default: quality)")
+    parser.add_argument("--perf-config", metavar="PATH", help="JSON file with additional performance profiles")
+    parser.add_argument("--roi", action="store_true", help="Track hands on a crop around the last seen hand")
+    parser.add_argument("--no-display", action="store_true", help="Skip GameDisplay compositing")
+    parser.add_argument("--width", type=int, default=640, help="Synthetic frame width")
+    parser.add_argument("--height", type=int, default=480, help="Synthetic frame height")
+    parser.add_argument("--fps", type=float, default=30.0, help="Synthetic frame rate")
+    parser.add_argument("--simulate", type=int, metavar="GAMES",
+                        help="Play this many duels headless with a simulated player and clock instead")
+    parser.add_argument("--json-out", metavar="PATH", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.simulate:
+        stats = simulate(args.simulate, args.difficulty, fps=args.fps, seed=args.seed)
+        print(f"\nSimulated {stats['games']} duels ({stats['rounds']} rounds, {stats['ticks']} ticks) "
+              f"in {stats['seconds']:.2f}s ({stats['rounds_per_second']:.0f} rounds/s)")
+        print(f"Player wins: {stats['player_wins']}, mage wins: {stats['mage_wins']}")
+        if args.json_out:
+            with open(args.json_out, "w") as f:
+                json.dump(stats, f, indent=1)
+        return 0
+
+    if args.perf_profile == "all":
+        profile_names = list(load_profiles(args.perf_config))
+    else:
+        profile_names = [args.perf_profile]
+
+    reports = []
+    for profile_name in profile_names:
+        report = run_benchmark(args, profile_name)
+        if report is None:
+            return 1
+        print_report(report)
+        reports.append(report)
+
+    if len(reports) > 1:
+        print("\nFrame rate per profile:")
+        for report in reports:
+            print(f"  {report['profile']:<12}{report['fps']:8.1f} FPS")
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(reports if len(reports) > 1 else reports[0], f, indent=1)
+        print(f"\nReport written to {args.json_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Wizard Fight Asset Builder
+Decodes the mage animation videos ahead of time into the animation cache
+(raw frame arrays at display size, with a manifest of each clip's fps, frame
+count, size and source fingerprint). The game and title screen play these
+directly (memory-mapped, no decoding or seeking) whenever they match the
+source videos, so the first run on a booth starts without decoding.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import from core and ui
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.animation_cache import CACHE_DIR, AnimationCache, clip_key, disk_usage
+from ui.game_display import ANIMATION_SOURCES
+
+
+def parse_size(text):
+    width, height = (int(v) for v in text.lower().split("x"))
+    return width, height
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode the mage animations into the animation cache ahead of time")
+    parser.add_argument("--size", type=parse_size, action="append", metavar="WxH",
+                        help="Display size to build for, can be repeated (default: 1920x1080)")
+    parser.add_argument("--out", default=CACHE_DIR, help=f"Cache directory (default: {CACHE_DIR})")
+    parser.add_argument("--force", action="store_true", help="Rebuild clips even if they are up to date")
+    parser.add_argument("--check", action="store_true",
+                        help="Only validate the cached clips against their sources, exit 1 if any is stale")
+    args = parser.parse_args()
+    sizes = args.size or [(1920, 1080)]
+
+    stale = 0
+    built = 0
+    for width, height in sizes:
+        cache = AnimationCache(width, height, cache_dir=args.out)
+        for name, source in ANIMATION_SOURCES.items():
+            key = clip_key(name, width, height)
+            cache.register(name, source)
+            frames, problem = cache.check(name)
+            del frames
+            if problem is None and not args.force:
+                print(f"{key}: up to date")
+                continue
+            if args.check:
+                print(f"{key}: {problem or 'rebuild requested'}")
+                stale += 1
+                continue
+
+            if not os.path.exists(source):
+                print(f"{key}: source {source} not found, skipped")
+                stale += 1
+                continue
+            start = time.perf_counter()
+            frames = cache.rebuild(name)  # Also records the clip in the manifest
+            if frames is None:
+                stale += 1
+                continue
+            built += 1
+            size_mb = frames.nbytes / (1024 * 1024)
+            print(f"{key}: {len(frames)} frames at {cache.fps(name):.2f} fps, "
+                  f"{size_mb:.0f} MB in {time.perf_counter() - start:.1f}s")
+            del frames
+
+    if args.check:
+        print(f"{stale} clip(s) missing or stale" if stale else "All cached clips are up to date")
+    else:
+        print(f"Built {built} clip(s) into {args.out}")
+    # Raw frames are large, and every display size is a full copy of every clip
+    print(f"Cache size on disk: {disk_usage(args.out) / (1024 * 1024):.0f} MB")
+    return 1 if stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
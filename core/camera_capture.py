@@ -0,0 +1,105 @@
+import threading
+import time
+
+import cv2
+
+
+class CameraCapture:
+    """Reads camera frames on a background thread and keeps only the newest one.
+
+    The game loop calls read() and gets the latest frame straight away instead
+    of blocking on camera I/O. Frames that arrive before the previous one was
+    consumed are dropped and counted. The newest frame is handed out again until
+    the next one arrives, so frames are read-only: drawing on one would also
+    draw on the input of later reads. Copy a frame to draw on it.
+    """
+
+    def __init__(self, source=0, first_frame_timeout=5.0):
+        self.source = source
+        self.first_frame_timeout = first_frame_timeout
+        self.cap = cv2.VideoCapture(source)
+
+        self._lock = threading.Condition()
+        self._frame = None
+        self._timestamp = None  # time.monotonic() when the frame was captured
+        self._frame_id = 0
+        self._consumed_id = 0
+        self._failed = False
+        self._running = False
+        self._thread = None
+
+        self.frames_captured = 0
+        self.frames_dropped = 0
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def start(self):
+        """Start the capture thread. Returns self so it can be chained"""
+        if self._running or not self.cap.isOpened():
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="CameraCapture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _capture_loop(self):
+        while self._running:
+            success, frame = self.cap.read()
+            timestamp = time.monotonic()
+            with self._lock:
+                if not success:
+                    self._failed = True
+                    self._lock.notify_all()
+                    break
+                if self._frame_id > self._consumed_id:
+                    # The previous frame was never read by the game loop
+                    self.frames_dropped += 1
+                frame.flags.writeable = False  # Shared with every read until the next frame
+                self._frame = frame
+                self._timestamp = timestamp
+                self._frame_id += 1
+                self.frames_captured += 1
+                self._lock.notify_all()
+        self._running = False
+
+    def read_latest(self, wait_for_new=False, timeout=None):
+        """Return (success, frame, capture_timestamp) for the newest frame.
+
+        Only waits until the first frame arrives, unless wait_for_new is set, in
+        which case it waits (up to timeout) for a frame that was not returned yet.
+        The frame is read-only, see the class docstring.
+        """
+        if not self._running and self._thread is None:
+            self.start()
+        if timeout is None:
+            timeout = self.first_frame_timeout
+
+        with self._lock:
+            if self._frame is None or (wait_for_new and self._frame_id == self._consumed_id):
+                self._lock.wait_for(
+                    lambda: self._failed or (self._frame is not None and
+                                             (not wait_for_new or self._frame_id > self._consumed_id)),
+                    timeout=timeout)
+            if self._failed or self._frame is None:
+                return False, None, None
+            self._consumed_id = self._frame_id
+            return True, self._frame, self._timestamp
+
+    def read(self):
+        """Drop-in replacement for cv2.VideoCapture.read() that never blocks on the camera"""
+        success, frame, _ = self.read_latest()
+        return success, frame
+
+    def stats(self):
+        return {"captured": self.frames_captured, "dropped": self.frames_dropped}
+
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.cap.release()
@@ -0,0 +1,352 @@
+import random
+import time
+
+import cv2
+
+from core.frame_buffers import ensure_buffer
+from core.gameLogic import (
+    SPELL_COUNTERS,
+    evaluate_spell,
+    is_game_over,
+    get_random_spell,
+    get_reaction_time,
+)
+from core.gesture_commit import GestureCommitter
+from core.gestureUtils import landmarks_to_array, classify_spells, SPELL_NAMES
+from core.performance_profiles import inference_size, resize_for_inference
+
+MAX_HP = 100
+IDLE_DURATION = 1.5  # Seconds of idle between attacks
+MAX_INPUT_LAG = 0.5  # Seconds past the deadline a round waits for frames captured before it
+
+# Session phases
+READY = "ready"          # Waiting for the player to start the duel
+ATTACK = "attack"        # Mage attack under way, player gestures are being read
+IDLE = "idle"            # Pause between rounds
+GAME_OVER = "game_over"  # One side is out of health
+
+
+class HandSpellDetector:
+    """Turns a camera frame into per-hand spell observations for a DuelSession.
+
+    Wraps a MediaPipe Hands instance (or a HandRoiTracker). Calling it with a
+    BGR frame returns (observations, hand_landmarks), where observations are
+    (hand_id, spell, confidence) tuples for a GestureCommitter.
+
+    Frames are downscaled to the performance profile's inference size (if
+    any) and converted to RGB into buffers reused every frame.
+    """
+
+    def __init__(self, hand_tracker, perf_profile=None, profiler=None):
+        self.hand_tracker = hand_tracker
+        self.perf_profile = perf_profile
+        self.profiler = profiler
+        self.resized = None  # Reused inference-size BGR buffer
+        self.rgb = None  # Reused RGB buffer passed to the model
+
+    def __call__(self, frame):
+        if self.perf_profile is not None:
+            h, w = frame.shape[:2]
+            width, height = inference_size(w, h, self.perf_profile)
+            if (width, height) != (w, h):
+                self.resized = ensure_buffer(self.resized, (height, width, 3))
+                frame = resize_for_inference(frame, self.perf_profile, dst=self.resized)
+        self.rgb = ensure_buffer(self.rgb, frame.shape)
+        img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        self._mark("convert")
+        results = self.hand_tracker.process(img_rgb)
+        self._mark("inference")
+
+        hand_landmarks = results.multi_hand_landmarks if results.multi_hand_landmarks else None
+        observations = []
+        if hand_landmarks:
+            # Classify every hand in one call
+            spell_codes = classify_spells(landmarks_to_array(hand_landmarks))
+            for i, code in enumerate(spell_codes):
+                # Handedness keeps each hand's votes separate across frames
+                hand_id, confidence = i, 1.0
+                if results.multi_handedness and i < len(results.multi_handedness):
+                    classification = results.multi_handedness[i].classification[0]
+                    hand_id, confidence = classification.label, classification.score
+                observations.append((hand_id, SPELL_NAMES[code], confidence))
+        return observations, hand_landmarks
+
+    def _mark(self, stage):
+        if self.profiler is not None:
+            self.profiler.mark(stage)
+
+
+class DuelSession:
+    """State of one duel, advanced one input frame at a time.
+
+    The session owns the health, round and phase state that used to live in
+    the game script's loops. tick(frame, now) takes the latest camera frame
+    and the current time from whatever clock the caller uses, so the same
+    logic runs live (camera + perf_counter), from a recording, or headless
+    with a simulated clock. A display is optional: without one the session
+    never touches OpenCV windows or animations, and render() is unavailable.
+    """
+
+    def __init__(self, difficulty="medium", detector=None, committer=None, display=None,
+                 spell_picker=get_random_spell, early_resolve=True, idle_duration=IDLE_DURATION,
+                 max_hp=MAX_HP, log=print, recorder=None, latency=None):
+        self.difficulty = difficulty
+        self.reaction_time = get_reaction_time(difficulty)
+        self.detector = detector  # frame -> (observations, hand_landmarks)
+        self.committer = committer or GestureCommitter()
+        self.display = display
+        self.spell_picker = spell_picker
+        self.early_resolve = early_resolve
+        self.idle_duration = idle_duration
+        self.max_hp = max_hp
+        self.log = log or (lambda *_: None)
+        self.recorder = recorder  # Optional LandmarkRecorder, gets every played tick and mage spell
+        self.latency = latency  # Optional RenderLatencyCompensator, widens each round's reaction window
+        self.reset()
+
+    def reset(self):
+        """Back to full health and round 1, waiting for the player to start"""
+        self.phase = READY
+        self.player_hp = self.max_hp
+        self.mage_hp = self.max_hp
+        self.round_num = 1
+        self.mage_spell = None
+        self.player_spell = None
+        self.hand_landmarks = None
+        self.round_start_time = None
+        self.round_window = self.reaction_time
+        self.idle_start_time = None
+        self.now = None
+        self.winner = None  # is_game_over() result once the duel ends
+        self.result_message = None
+        self.rounds = []  # One record per resolved round
+        self.ticks = 0
+        self.last_input_at = None  # Capture time of the last frame that was voted with
+        if self.display is not None:
+            self.display.return_to_idle()
+
+    def start(self, now):
+        """Begin the duel with the first round"""
+        self.now = now
+        self.log("\nWizard Duel Begins!")
+        self.start_round(now)
+
+    def restart(self, now):
+        """Play again from full health"""
+        self.log("Restarting game...")
+        self.reset()
+        self.start(now)
+
+    def start_round(self, now):
+        self.phase = ATTACK
+        self.round_start_time = now
+        self.mage_spell = self.spell_picker()
+        allowance = self.latency.allowance() if self.latency is not None else 0.0
+        self.round_window = self.reaction_time + allowance
+        self.player_spell = None
+        self.hand_landmarks = None
+        self.committer.reset()
+        if self.recorder is not None:
+            self.recorder.write_mage_spell(now, self.round_num, self.mage_spell, allowance)
+        self.log(f"\nROUND {self.round_num}")
+        self.log(f"Mage HP: {self.mage_hp} | YOUR HP: {self.player_hp}")
+        self.log(f"The mage casts: {self.mage_spell.upper()}! Counter it!")
+        if self.display is not None:
+            self.display.start_attack_animation(self.round_window)
+
+    @property
+    def remaining_time(self):
+        """Seconds left to react in the current round (or between rounds while idle)"""
+        if self.phase == ATTACK:
+            return self.round_window - (self.now - self.round_start_time)
+        if self.phase == IDLE:
+            return self.idle_duration - (self.now - self.idle_start_time)
+        return None
+
+    @property
+    def finished(self):
+        return self.phase == GAME_OVER
+
+    def tick(self, frame, now, captured_at=None):
+        """Advance the session to `now`, reading player input from `frame`. Returns the phase.
+
+        `captured_at` is when the frame was captured, on the same clock as `now`.
+        Input is judged by it: a gesture captured before the deadline counts even
+        if inference finishes after it, and frames captured before the round
+        started are ignored. Without it the frame is taken as captured at `now`.
+        A `frame` of None means there is no new input this tick: the clock
+        advances, but no votes are cast. The same goes for a frame with the same
+        capture time as the last one read: when the loop runs faster than the
+        camera, a camera frame is only voted with once.
+        """
+        self.now = now
+        self.ticks += 1
+        playing = self.phase in (ATTACK, IDLE)
+        observations, hand_landmarks = (), None
+        if captured_at is None:
+            captured_at = now
+        if frame is not None and captured_at == self.last_input_at:
+            frame = None  # Already voted with this camera frame
+
+        if self.phase == ATTACK:
+            deadline = self.round_start_time + self.round_window
+            if captured_at >= deadline or now >= deadline + MAX_INPUT_LAG:
+                self.resolve_round(now)
+            elif frame is not None and captured_at >= self.round_start_time:
+                self.last_input_at = captured_at
+                observations, hand_landmarks = self.read_input(frame)
+                # Resolve the round as soon as the spell is locked in
+                if self.committer.committed_spell and self.early_resolve:
+                    self.resolve_round(now)
+        elif self.phase == IDLE:
+            if now - self.idle_start_time >= self.idle_duration:
+                self.log(f"Idle phase completed, starting round {self.round_num + 1}")
+                self.round_num += 1
+                self.start_round(now)
+        if playing and self.recorder is not None:
+            self.recorder.write_frame(now, hand_landmarks, observations, captured_at, has_input=frame is not None)
+        return self.phase
+
+    def read_input(self, frame):
+        """Run the detector on a frame and vote with every hand it found. Returns (observations, hand_landmarks)"""
+        if self.detector is None or frame is None:
+            observations, self.hand_landmarks = [], None
+        else:
+            observations, self.hand_landmarks = self.detector(frame)
+
+        # Show the latest detected spell until one is locked in
+        for _, spell, _ in observations:
+            if spell:
+                self.player_spell = spell
+        committed_spell = self.committer.update_frame(observations)
+        if committed_spell:
+            self.player_spell = committed_spell
+        return observations, self.hand_landmarks
+
+    def resolve_round(self, now):
+        # Judge the locked-in spell, or the most consistently shown one if none locked in
+        self.player_spell = self.committer.leading_spell()
+        self.hand_landmarks = None
+        if self.player_spell:
+            self.log(f"You cast: {self.player_spell.upper()}")
+        else:
+            self.log("You failed to cast a spell in time!")
+
+        self.player_hp, self.mage_hp, self.result_message = evaluate_spell(
+            self.player_spell, self.mage_spell, self.player_hp, self.mage_hp)
+        self.log(self.result_message)
+        self.rounds.append({
+            "round": self.round_num,
+            "mage_spell": self.mage_spell,
+            "player_spell": self.player_spell,
+            "reaction_seconds": now - self.round_start_time,
+            "player_hp": self.player_hp,
+            "mage_hp": self.mage_hp,
+        })
+
+        self.winner = is_game_over(self.player_hp, self.mage_hp)
+        if self.winner == "player":
+            self.log("\nYou have been defeated!")
+            self.phase = GAME_OVER
+            if self.display is not None:
+                self.display.start_victory_animation()  # Mage wins
+        elif self.winner == "mage":
+            self.log("\nThe mage has been defeated! YOU WIN!")
+            self.phase = GAME_OVER
+            if self.display is not None:
+                self.display.start_defeat_animation()  # User wins
+        else:
+            self.log("Preparing for next round...")
+            self.phase = IDLE
+            self.idle_start_time = now
+
+    def forfeit(self):
+        """Player quits mid-duel, which counts as a defeat"""
+        self.player_hp = 0
+        self.winner = "player"
+        self.phase = GAME_OVER
+        if self.recorder is not None:
+            self.recorder.write_forfeit(self.now)
+        self.log("\nYou have been defeated!")
+        if self.display is not None:
+            self.display.start_victory_animation()  # Mage wins
+
+    def render(self, camera_frame, refresh_animation=True):
+        """Compose the display frame for the current phase"""
+        display = self.display
+        if self.phase == GAME_OVER:
+            return display.create_win_defeat_screen(self.winner, self.player_hp, self.mage_hp,
+                                                    self.round_num, refresh_animation)
+
+        attacking = self.phase == ATTACK
+        frame = display.create_game_display(
+            camera_frame=camera_frame,
+            mage_spell=self.mage_spell if attacking else None,
+            player_spell=self.player_spell if attacking else None,
+            countdown=self.remaining_time if attacking else None,
+            player_hp=self.player_hp,
+            mage_hp=self.mage_hp,
+            round_num=self.round_num,
+            hand_landmarks=self.hand_landmarks if attacking else None,
+            refresh_animation=refresh_animation
+        )
+        if self.phase == READY:
+            display.draw_message(frame, "Press any key to START", (50, display.frame_height // 2), 1, 2)
+        elif self.phase == IDLE:
+            display.draw_message(frame, f"Preparing for next round... ({max(0.0, self.remaining_time):.1f}s)",
+                                 (50, 200), 1.2, 3)
+        return frame
+
+
+def counter_player(accuracy=0.8, delay=0.3, rng=random):
+    """Simulated player for headless runs: after `delay` seconds it shows the
+    counter spell with probability `accuracy`, otherwise a random wrong spell"""
+    spells = list(SPELL_COUNTERS)
+
+    def choose(session):
+        if session.now - session.round_start_time < delay:
+            return None
+        if session.round_num not in choose.picks:
+            counter = SPELL_COUNTERS[session.mage_spell]
+            if rng.random() < accuracy:
+                choose.picks[session.round_num] = counter
+            else:
+                choose.picks[session.round_num] = rng.choice([s for s in spells if s != counter])
+        return choose.picks[session.round_num]
+
+    choose.picks = {}
+    return choose
+
+
+def simulate(games=1000, difficulty="medium", player=None, fps=30.0, seed=None):
+    """Play whole duels headless against a simulated clock and player.
+
+    Every tick advances the clock by 1/fps and feeds the player's current
+    spell straight to the session as the "frame", so the game loop, voting and
+    round logic run exactly as live, just without a camera, model or window.
+    `player` is a factory taking a random.Random and returning a
+    session -> spell callable (default: counter_player).
+    """
+    rng = random.Random(seed)
+    dt = 1.0 / fps
+    stats = {"games": games, "rounds": 0, "ticks": 0, "player_wins": 0, "mage_wins": 0}
+    start = time.perf_counter()
+
+    for _ in range(games):
+        choose = player(rng) if player else counter_player(rng=rng)
+        session = DuelSession(difficulty,
+                              detector=lambda spell: ([(0, spell, 1.0)] if spell else [], None),
+                              spell_picker=lambda: rng.choice(list(SPELL_COUNTERS)),
+                              log=None)
+        now = 0.0
+        session.start(now)
+        while not session.finished:
+            now += dt
+            session.tick(choose(session) if session.phase == ATTACK else None, now)
+        stats["rounds"] += len(session.rounds)
+        stats["ticks"] += session.ticks
+        stats["player_wins" if session.winner == "mage" else "mage_wins"] += 1
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["rounds_per_second"] = stats["rounds"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return stats
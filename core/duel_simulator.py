@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Wizard Fight Duel Simulator
+Vectorized Monte Carlo simulation of whole duels with the batched game rules,
+for tuning DIFFICULTY_LEVELS and damage against synthetic players. Every
+active duel plays its next round at once as NumPy arrays, so millions of
+duels run per second.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+
+# Add the parent directory to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.gameLogic import (
+    COUNTER_CODES,
+    DAMAGE,
+    DIFFICULTY_LEVELS,
+    NOT_OVER,
+    MAGE_LOST,
+    SPELL_CODES,
+    evaluate_spells,
+    game_over_codes,
+    get_reaction_time,
+    random_spells,
+)
+from core.duel_session import MAX_HP, IDLE_DURATION
+
+# accuracy: chance the spell shown is the counter (otherwise one of the others)
+# latency_mean / latency_std: seconds from the attack appearing until the gesture is shown
+PlayerModel = namedtuple("PlayerModel", "accuracy latency_mean latency_std")
+
+PLAYER_MODELS = {
+    "novice": PlayerModel(accuracy=0.6, latency_mean=1.0, latency_std=0.3),
+    "casual": PlayerModel(accuracy=0.8, latency_mean=0.7, latency_std=0.2),
+    "expert": PlayerModel(accuracy=0.95, latency_mean=0.45, latency_std=0.1),
+}
+
+SPELL_COUNT = len(SPELL_CODES) - 1  # Real spells, code 0 is "no spell"
+
+# (mage spell code - 1) * SPELL_COUNT + choice -> spell shown: choice 0 is the
+# counter, 1 and 2 are the other spells in code order
+SHOWN_SPELLS = np.array([code
+                         for mage in range(1, SPELL_COUNT + 1)
+                         for code in [COUNTER_CODES[mage]] + [c for c in range(1, SPELL_COUNT + 1)
+                                                              if c != COUNTER_CODES[mage]]],
+                        dtype=np.uint8)
+
+
+LATENCY_BITS = 12  # Latency is drawn from 2**12 precomputed quantiles
+
+
+@lru_cache(maxsize=32)
+def latency_quantiles(player):
+    """The player's reaction latency distribution as evenly spaced quantiles (seconds, >= 0)"""
+    size = 1 << LATENCY_BITS
+    dist = NormalDist(player.latency_mean, max(player.latency_std, 1e-9))
+    return np.array([max(0.0, dist.inv_cdf((i + 0.5) / size)) for i in range(size)], dtype=np.float32)
+
+
+def player_spells(rng, mage_spells, window, player, commit_seconds=0.0):
+    """Spell codes a synthetic player shows against `mage_spells` in a `window`-second round,
+    and how long each round lasts with early resolve. Code 0 where the gesture came too late"""
+    n = len(mage_spells)
+    # One 32-bit draw per round: latency quantile, which wrong spell, and whether it's right
+    bits = rng.integers(0, 1 << 32, size=n, dtype=np.uint32)
+    latency = latency_quantiles(player)[bits & ((1 << LATENCY_BITS) - 1)]
+    miss_offset = ((bits >> LATENCY_BITS) & 1).astype(np.uint8) + np.uint8(1)
+    correct = (bits >> (LATENCY_BITS + 1)) < np.uint32(player.accuracy * (1 << (31 - LATENCY_BITS)))
+
+    # 0 shows the counter, 1 and 2 the two other spells
+    choice = ~correct * miss_offset
+    spells = SHOWN_SPELLS[mage_spells * np.uint8(SPELL_COUNT) + choice - np.uint8(SPELL_COUNT)]
+    # Shown before the deadline counts (the leading spell is judged even if it never locked in)
+    spells[latency >= window] = 0
+    # The round ends when the spell locks in, or at the deadline
+    round_seconds = np.minimum(latency + commit_seconds, window)
+    return spells, round_seconds
+
+
+def simulate_duels(games=1_000_000, difficulty="medium", player=PLAYER_MODELS["casual"], seed=None,
+                   max_hp=MAX_HP, damage=DAMAGE, window=None, commit_frames=4, fps=30.0,
+                   idle_duration=IDLE_DURATION):
+    """Play `games` duels at once. Returns per-duel arrays: rounds, seconds and whether the player won.
+
+    `window` overrides the difficulty's reaction time, for trying out new values.
+    A spell takes `commit_frames` frames at `fps` to lock in after it is shown.
+    """
+    rng = np.random.default_rng(seed)
+    window = get_reaction_time(difficulty) if window is None else window
+    commit_seconds = commit_frames / fps
+
+    rounds = np.zeros(games, dtype=np.int32)
+    seconds = np.zeros(games, dtype=np.float32)
+    outcome = np.zeros(games, dtype=np.uint8)
+
+    # State of the duels still going, compacted every round so finished ones cost nothing
+    ids = np.arange(games)
+    player_hp = np.full(games, max_hp, dtype=np.int16)
+    mage_hp = np.full(games, max_hp, dtype=np.int16)
+    elapsed = np.zeros(games, dtype=np.float32)
+    played = 0
+
+    while len(ids):
+        mage = random_spells(rng, len(ids))
+        spells, round_seconds = player_spells(rng, mage, window, player, commit_seconds)
+        player_hp, mage_hp, _ = evaluate_spells(spells, mage, player_hp, mage_hp, damage)
+        elapsed += round_seconds
+        played += 1
+
+        over = game_over_codes(player_hp, mage_hp)
+        going = over == NOT_OVER
+        done = ~going
+        rounds[ids[done]] = played
+        seconds[ids[done]] = elapsed[done]
+        outcome[ids[done]] = over[done]
+
+        # Rounds that don't end the duel are followed by the idle pause
+        ids, player_hp, mage_hp = ids[going], player_hp[going], mage_hp[going]
+        elapsed = elapsed[going] + idle_duration
+
+    return {"rounds": rounds, "seconds": seconds, "player_won": outcome == MAGE_LOST}
+
+
+def summarize(result, elapsed=None):
+    """Win rate and game length distribution of a simulate_duels() result"""
+    rounds, seconds = result["rounds"], result["seconds"]
+    summary = {
+        "games": len(rounds),
+        "win_rate": float(result["player_won"].mean()),
+        "rounds_mean": float(rounds.mean()),
+        "rounds_p50": float(np.percentile(rounds, 50)),
+        "rounds_p95": float(np.percentile(rounds, 95)),
+        "rounds_histogram": {int(r): int(c) for r, c in zip(*np.unique(rounds, return_counts=True))},
+        "seconds_mean": float(seconds.mean()),
+        "seconds_p50": float(np.percentile(seconds, 50)),
+        "seconds_p95": float(np.percentile(seconds, 95)),
+    }
+    if elapsed:
+        summary["duels_per_second"] = len(rounds) / elapsed
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of Wizard Fight duels")
+    parser.add_argument("--games", type=int, default=1_000_000, help="Duels per difficulty and player model")
+    parser.add_argument("--difficulty", default="all", choices=list(DIFFICULTY_LEVELS) + ["all"])
+    parser.add_argument("--player", default="all", choices=list(PLAYER_MODELS) + ["all"],
+                        help="Synthetic player model")
+    parser.add_argument("--accuracy", type=float, help="Custom player: chance of showing the counter spell")
+    parser.add_argument("--latency", type=float, nargs=2, metavar=("MEAN", "STD"),
+                        help="Custom player: seconds until the gesture is shown")
+    parser.add_argument("--window", type=float, help="Try this reaction time instead of the difficulty's")
+    parser.add_argument("--damage", type=int, default=DAMAGE, help=f"HP lost per round (default: {DAMAGE})")
+    parser.add_argument("--hp", type=int, default=MAX_HP, help=f"Starting HP (default: {MAX_HP})")
+    parser.add_argument("--histogram", action="store_true", help="Print the game length distribution")
+    parser.add_argument("--seed", type=int, help="Random seed")
+    args = parser.parse_args()
+
+    if args.accuracy is not None or args.latency:
+        base = PLAYER_MODELS["casual"]
+        latency = args.latency or (base.latency_mean, base.latency_std)
+        players = {"custom": PlayerModel(args.accuracy if args.accuracy is not None else base.accuracy, *latency)}
+    elif args.player == "all":
+        players = PLAYER_MODELS
+    else:
+        players = {args.player: PLAYER_MODELS[args.player]}
+    difficulties = list(DIFFICULTY_LEVELS) if args.difficulty == "all" else [args.difficulty]
+
+    print(f"{'difficulty':<10} {'player':<8} {'win rate':>8} {'rounds':>15} {'seconds':>16} {'duels/s':>11}")
+    print(f"{'':<10} {'':<8} {'':>8} {'mean p50 p95':>15} {'mean p50 p95':>16}")
+    for difficulty in difficulties:
+        for name, player in players.items():
+            start = time.perf_counter()
+            result = simulate_duels(args.games, difficulty, player, seed=args.seed, max_hp=args.hp,
+                                    damage=args.damage, window=args.window)
+            elapsed = time.perf_counter() - start
+            summary = summarize(result, elapsed)
+            print(f"{difficulty:<10} {name:<8} {summary['win_rate']:>8.1%} "
+                  f"{summary['rounds_mean']:>5.1f} {summary['rounds_p50']:>4.0f} {summary['rounds_p95']:>4.0f} "
+                  f"{summary['seconds_mean']:>6.1f} {summary['seconds_p50']:>4.0f} {summary['seconds_p95']:>4.0f} "
+                  f"{summary['duels_per_second']:>11,.0f}")
+            if args.histogram:
+                total = summary["games"]
+                for r, count in summary["rounds_histogram"].items():
+                    print(f"    {r:>3} rounds {count / total:>7.2%} {'#' * round(50 * count / total)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
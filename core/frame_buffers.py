@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def ensure_buffer(buffer, shape, dtype=np.uint8):
+    """Return `buffer` if it already has this shape and dtype, else a new empty array.
+
+    Used with OpenCV's dst= arguments so per-frame conversions and resizes
+    write into the same memory every frame instead of allocating.
+    """
+    shape = tuple(shape)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        return np.empty(shape, dtype=dtype)
+    return buffer
+
+
+class DoubleBuffer:
+    """Two preallocated frames used alternately as the drawing target.
+
+    back() hands out the buffer that was not returned last time, so the
+    previous frame (the front buffer) stays intact while the next one is
+    composed into the other. A frame returned by back() is valid until the
+    call after next; callers that need to keep a frame longer must copy it.
+    """
+
+    def __init__(self, shape, dtype=np.uint8):
+        self.buffers = [np.zeros(shape, dtype=dtype), np.zeros(shape, dtype=dtype)]
+        self.index = 0
+
+    def back(self):
+        """Swap buffers and return the one to draw the next frame into"""
+        self.index ^= 1
+        return self.buffers[self.index]
+
+    def front(self):
+        """The most recently handed out frame"""
+        return self.buffers[self.index]
@@ -0,0 +1,266 @@
+import multiprocessing
+import queue
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# One hand tracking result, as sent from the inference process to the render process.
+# landmarks is an (N, 21, 3) float32 array, observations are (hand_id, spell, confidence).
+# captured_at and inferred_at come from time.monotonic(), the clock every process shares.
+InferenceResult = namedtuple("InferenceResult", "seq captured_at inferred_at observations landmarks")
+
+
+class SharedFrameRing:
+    """A ring of camera frames in shared memory, written by one process and read by others.
+
+    Each slot holds one frame plus its sequence number and capture time.
+    The writer fills the next slot in place (the camera decodes straight into
+    it) and then publishes it. Readers get a NumPy view of the newest frame
+    without copying. A slot is reused only after `slots - 1` newer frames, and
+    is_current() tells a reader whether the frame it was working on got
+    overwritten in the meantime.
+    """
+
+    def __init__(self, shape, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        frame_bytes = int(np.prod(self.shape))
+        header_bytes = 8 * (2 * slots + 1)
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * frame_bytes)
+        else:
+            # Processes started by FramePipeline share the creator's resource tracker,
+            # and only the creating process unlinks the block
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        buf = self.shm.buf
+        self.seqs = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=0)
+        self.timestamps = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=8 * slots)
+        self.latest = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=16 * slots)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=buf, offset=header_bytes)
+        if self.owner:
+            self.seqs[:] = -1
+            self.latest[0] = -1
+        self.next_seq = 0
+
+    def spec(self):
+        """Arguments that attach another process to this ring"""
+        return {"shape": self.shape, "slots": self.slots, "name": self.shm.name}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec["shape"], spec["slots"], spec["name"])
+
+    def next_slot(self):
+        """View of the slot the next frame is written into. Marked as being written until publish()"""
+        slot = self.next_seq % self.slots
+        self.seqs[slot] = -1
+        return self.frames[slot]
+
+    def publish(self, timestamp):
+        """Make the frame written into next_slot() the newest one. Returns its sequence number"""
+        seq = self.next_seq
+        slot = seq % self.slots
+        self.timestamps[slot] = timestamp
+        self.seqs[slot] = seq
+        self.latest[0] = seq
+        self.next_seq += 1
+        return seq
+
+    def read_latest(self, after=-1):
+        """(seq, capture_time, frame view) of the newest frame if it is newer than `after`, else None"""
+        seq = int(self.latest[0])
+        if seq <= after:
+            return None
+        slot = seq % self.slots
+        timestamp = float(self.timestamps[slot])
+        if self.seqs[slot] != seq:
+            return None  # Already being overwritten
+        return seq, timestamp, self.frames[slot]
+
+    def is_current(self, seq):
+        """Whether frame `seq` is still intact in its slot"""
+        return self.seqs[seq % self.slots] == seq
+
+    def close(self):
+        # Views must go before the mapping can be closed
+        self.seqs = self.timestamps = self.latest = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # A caller still holds a frame view, the mapping goes away with the process
+        if self.owner:
+            self.shm.unlink()
+
+
+def capture_worker(source, spec_queue, stop, failed, slots):
+    """Capture process: decodes camera frames straight into the shared ring at the camera's rate"""
+    import cv2
+
+    cap = cv2.VideoCapture(source)
+    success, frame = cap.read() if cap.isOpened() else (False, None)
+    if not success:
+        spec_queue.put({"error": f"could not read from camera {source}"})
+        cap.release()
+        return
+
+    ring = SharedFrameRing(frame.shape, slots)
+    ring.next_slot()[:] = frame
+    ring.publish(time.monotonic())
+    spec_queue.put(ring.spec())
+    try:
+        while not stop.is_set():
+            slot = ring.next_slot()
+            success, frame = cap.read(slot)
+            timestamp = time.monotonic()
+            if not success:
+                failed.set()
+                break
+            if frame is not slot and frame.ctypes.data != slot.ctypes.data:
+                slot[:] = frame  # The camera changed size or the backend ignored the buffer
+            ring.publish(timestamp)
+    finally:
+        cap.release()
+        stop.wait()  # Keep the ring alive until the other stages have let go of it
+        ring.close()
+
+
+def inference_worker(spec, results, stop, profile_name, perf_config, use_roi, interval):
+    """Inference process: runs hand tracking on the newest frame whenever it is free, sends back landmarks.
+
+    `interval` is a shared value with the minimum seconds between inferences (0 for as fast as possible).
+    """
+    from core.duel_session import HandSpellDetector
+    from core.gestureUtils import landmarks_to_array
+    from core.hand_roi import HandRoiTracker
+    from core.performance_profiles import get_profile, create_hands
+    from core.startup import warm_up_hands
+
+    ring = SharedFrameRing.attach(spec)
+    _, perf_profile = get_profile(profile_name, perf_config)
+    hands = create_hands(perf_profile)
+    warm_up_hands(hands)
+    hand_tracker = HandRoiTracker.for_profile(hands, perf_profile) if use_roi else hands
+    detector = HandSpellDetector(hand_tracker, perf_profile)
+
+    last_seq = -1
+    last_start = 0.0
+    try:
+        while not stop.is_set():
+            if time.perf_counter() - last_start < interval.value:
+                time.sleep(0.001)  # Throttled, leave the CPU to the other stages
+                continue
+            latest = ring.read_latest(after=last_seq)
+            if latest is None:
+                time.sleep(0.001)
+                continue
+            seq, captured_at, frame = latest
+            last_start = time.perf_counter()
+            observations, hand_landmarks = detector(frame)
+            last_seq = seq
+            if not ring.is_current(seq):
+                continue  # The camera lapped us mid-frame, the result may be torn
+            results.put(InferenceResult(seq, captured_at, time.monotonic(), observations,
+                                        landmarks_to_array(hand_landmarks)))
+    finally:
+        hand_tracker.close()
+        frame = None
+        ring.close()
+
+
+def result_detector(result):
+    """DuelSession detector for InferenceResult input: the work was already done by the inference process"""
+    return result.observations, result.landmarks if len(result.landmarks) else None
+
+
+class FramePipeline:
+    """Camera capture and hand tracking in their own processes, feeding the game loop.
+
+    The capture process writes frames into a SharedFrameRing at the camera's
+    rate. The inference process always takes the newest frame when it is free
+    and sends back only small InferenceResults (landmark arrays and spells).
+    The game (render) process reads the newest frame from the ring for the
+    camera view and collects the results, so no stage waits on another or
+    shares a GIL with it.
+    """
+
+    def __init__(self, source=0, perf_profile=None, perf_config=None, roi=False, slots=4):
+        self.source = source
+        self.perf_profile = perf_profile
+        self.perf_config = perf_config
+        self.roi = roi
+        self.slots = slots
+        self.context = multiprocessing.get_context("spawn")
+        self.stop_event = self.context.Event()
+        self.capture_failed = self.context.Event()
+        self.results_queue = self.context.Queue()
+        self.inference_interval = self.context.Value("d", 0.0, lock=False)
+        self.processes = []
+        self.ring = None
+        self.results_received = 0
+
+    def start(self, timeout=15.0):
+        """Start both processes and wait for the first frame. Returns self, or None if the camera fails"""
+        spec_queue = self.context.Queue()
+        capture = self.context.Process(target=capture_worker, name="capture",
+                                       args=(self.source, spec_queue, self.stop_event, self.capture_failed, self.slots),
+                                       daemon=True)
+        capture.start()
+        self.processes.append(capture)
+        try:
+            spec = spec_queue.get(timeout=timeout)
+        except queue.Empty:
+            spec = {"error": "camera process did not start"}
+        if "error" in spec:
+            print(f"Error: {spec['error']}")
+            self.close()
+            return None
+
+        self.ring = SharedFrameRing.attach(spec)
+        inference = self.context.Process(target=inference_worker, name="inference",
+                                         args=(spec, self.results_queue, self.stop_event, self.perf_profile,
+                                               self.perf_config, self.roi, self.inference_interval), daemon=True)
+        inference.start()
+        self.processes.append(inference)
+        return self
+
+    def set_inference_fps(self, fps):
+        """Run hand tracking at most `fps` times per second (None for as fast as possible)"""
+        self.inference_interval.value = 1.0 / fps if fps else 0.0
+
+    def latest_frame(self):
+        """(seq, capture_time, frame view) of the newest camera frame. The view must not be drawn on"""
+        return self.ring.read_latest() if self.ring is not None else None
+
+    def results(self):
+        """All inference results that arrived since the last call, oldest first"""
+        received = []
+        while True:
+            try:
+                received.append(self.results_queue.get_nowait())
+            except queue.Empty:
+                break
+        self.results_received += len(received)
+        return received
+
+    def failed(self):
+        """Whether the camera stopped delivering frames"""
+        return self.capture_failed.is_set()
+
+    def stats(self):
+        captured = int(self.ring.latest[0]) + 1 if self.ring is not None else 0
+        return {"captured": captured, "inferred": self.results_received}
+
+    def close(self):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
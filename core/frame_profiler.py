@@ -0,0 +1,128 @@
+import csv
+import json
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class FrameProfiler:
+    """Low-overhead per-stage frame timing.
+
+    Call begin_frame() at the top of a loop iteration, mark(stage) after each
+    stage and end_frame() at the bottom. Each mark stores the time since the
+    previous mark, so stages must be marked in the order they run. Rolling
+    p50/p95/p99 are kept per stage over the last `window` frames, and every
+    frame can be kept for export to CSV/JSON.
+    """
+
+    def __init__(self, enabled=True, window=300, keep_records=False):
+        self.enabled = enabled
+        self.window = window
+        self.keep_records = keep_records
+
+        self.stages = []  # Stage names in the order they were first seen
+        self.history = {}  # stage -> deque of recent durations (seconds)
+        self.records = []  # Per-frame records for export
+        self.frame_index = 0
+
+        self._frame = None
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+        self._phase = None
+        self._summary = {}
+        self._summary_frame = -1
+
+    def begin_frame(self, phase=None):
+        if not self.enabled:
+            return
+        self._frame_start = self._last_mark = time.perf_counter()
+        self._frame = {}
+        self._phase = phase
+
+    def mark(self, stage):
+        """Charge the time since the previous mark (or frame start) to a stage"""
+        if not self.enabled or self._frame is None:
+            return
+        now = time.perf_counter()
+        self._frame[stage] = self._frame.get(stage, 0.0) + now - self._last_mark
+        self._last_mark = now
+
+    def end_frame(self):
+        if not self.enabled or self._frame is None:
+            return
+        frame = self._frame
+        frame["total"] = time.perf_counter() - self._frame_start
+        for stage, duration in frame.items():
+            if stage not in self.history:
+                self.stages.append(stage)
+                self.history[stage] = deque(maxlen=self.window)
+            self.history[stage].append(duration)
+
+        if self.keep_records:
+            record = {"frame": self.frame_index, "phase": self._phase,
+                      "start": self._frame_start}
+            record.update({stage: round(duration * 1000.0, 4) for stage, duration in frame.items()})
+            self.records.append(record)
+
+        self.frame_index += 1
+        self._frame = None
+
+    def percentiles(self, stage):
+        """Rolling (p50, p95, p99) in milliseconds for a stage"""
+        samples = self.history.get(stage)
+        if not samples:
+            return (0.0, 0.0, 0.0)
+        p50, p95, p99 = np.percentile(np.fromiter(samples, dtype=np.float64), [50, 95, 99]) * 1000.0
+        return (p50, p95, p99)
+
+    def summary(self):
+        """{stage: (p50, p95, p99)} in milliseconds, "total" last"""
+        stages = [s for s in self.stages if s != "total"] + (["total"] if "total" in self.history else [])
+        return {stage: self.percentiles(stage) for stage in stages}
+
+    def draw_overlay(self, image, x=50, y=320, refresh_every=15):
+        """Draw the rolling per-stage percentiles onto a frame"""
+        if not self.enabled:
+            return
+        # Percentiles are recomputed every few frames to keep the overlay cheap
+        if self.frame_index - self._summary_frame >= refresh_every:
+            self._summary = self.summary()
+            self._summary_frame = self.frame_index
+        if not self._summary:
+            return
+
+        lines = ["stage          p50    p95    p99 (ms)"]
+        for stage, (p50, p95, p99) in self._summary.items():
+            lines.append(f"{stage:<12}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+
+        line_height = 22
+        cv2.rectangle(image, (x - 10, y - 20), (x + 440, y + line_height * (len(lines) - 1) + 10),
+                      (0, 0, 0), -1)
+        for i, line in enumerate(lines):
+            cv2.putText(image, line, (x, y + i * line_height), cv2.FONT_HERSHEY_PLAIN, 1.2,
+                        (0, 255, 255), 1, cv2.LINE_8)
+
+    def print_summary(self):
+        if not self.enabled or not self.history:
+            return
+        print(f"\nFrame timings over the last {self.window} frames (ms):")
+        print(f"{'stage':<12}{'p50':>8}{'p95':>8}{'p99':>8}")
+        for stage, (p50, p95, p99) in self.summary().items():
+            print(f"{stage:<12}{p50:8.2f}{p95:8.2f}{p99:8.2f}")
+
+    def dump(self, path):
+        """Write per-frame records to a .json or .csv file"""
+        if not self.records:
+            return
+        if path.lower().endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"summary_ms": self.summary(), "frames": self.records}, f, indent=1)
+        else:
+            fields = ["frame", "phase", "start"] + [s for s in self.stages]
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(self.records)
+        print(f"Frame timings written to {path}")
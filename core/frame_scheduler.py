@@ -0,0 +1,56 @@
+import time
+
+import cv2
+
+
+class FrameScheduler:
+    """Paces a display loop against a fixed frame deadline.
+
+    Instead of sleeping a fixed cv2.waitKey(8) after every frame, wait_key()
+    only waits for whatever is left of the current frame's budget (but always
+    at least 1 ms so keyboard input is still polled every tick). When a frame
+    overruns its deadline the scheduler reports that it is behind so the loop
+    can skip non-essential work on the next frame.
+    """
+
+    def __init__(self, target_fps=120.0):
+        self.target_fps = target_fps
+        self.frame_budget = 1.0 / target_fps
+        self.next_deadline = None
+        self.behind = False
+        self.frames = 0
+        self.late_frames = 0
+        self.last_wake = None
+        self.work_time = None  # Seconds the last frame took to produce, without the wait
+
+    def should_refresh(self):
+        """Whether non-essential work (e.g. advancing the animation) should run this frame"""
+        return not self.behind
+
+    def wait_key(self):
+        """Wait out the rest of the frame budget while polling the keyboard. Returns the key code"""
+        now = time.perf_counter()
+        self.work_time = now - self.last_wake if self.last_wake is not None else None
+        if self.next_deadline is None:
+            self.next_deadline = now + self.frame_budget
+
+        remaining = self.next_deadline - now
+        self.behind = remaining < 0
+        key = cv2.waitKey(max(1, int(remaining * 1000))) & 0xFF
+
+        self.frames += 1
+        if self.behind:
+            self.late_frames += 1
+            # Don't try to catch up on missed frames, restart the cadence from now
+            self.next_deadline = time.perf_counter() + self.frame_budget
+        else:
+            # Fixed cadence from the previous deadline so pacing doesn't drift
+            self.next_deadline += self.frame_budget
+        self.last_wake = time.perf_counter()
+        return key
+
+    def reset(self):
+        """Forget the current cadence, e.g. after a blocking pause between screens"""
+        self.next_deadline = None
+        self.behind = False
+        self.last_wake = None
@@ -1,3 +1,7 @@
+import random
+
+import numpy as np
+
 SPELL_COUNTERS = {
     "Fire" : "Water",
     "Water": "Earth",
@@ -10,21 +14,44 @@ DIFFICULTY_LEVELS = {
     "hard" : 0.75
  }
 
+DAMAGE = 10 # HP lost by whoever loses a round
+
+SPELLS = tuple(SPELL_COUNTERS)
+
+# Spell codes for the batched API, same as gestureUtils.SPELL_NAMES (0 = no spell)
+SPELL_CODES = {None: 0, "Fire": 1, "Water": 2, "Earth": 3}
+COUNTER_CODES = np.zeros(len(SPELL_CODES), dtype=np.uint8) # mage spell code -> code of its counter
+for _mage, _counter in SPELL_COUNTERS.items():
+    COUNTER_CODES[SPELL_CODES[_mage]] = SPELL_CODES[_counter]
+
+# Batched is_game_over() results
+NOT_OVER, PLAYER_LOST, MAGE_LOST = 0, 1, 2
+
 def is_counter (playerSpell, mageSpell):
     return SPELL_COUNTERS.get(mageSpell) == playerSpell
 
 def evaluate_spell(playerSpell , mageSpell , playerHp, mageHp ):
     if is_counter(playerSpell,mageSpell):
-        mageHp -= 10
-        result = f"You cast {playerSpell} and countered the mage! Mage -10 HP."
+        mageHp -= DAMAGE
+        result = f"You cast {playerSpell} and countered the mage! Mage -{DAMAGE} HP."
     elif playerSpell: # Player cast something, but it wasn't a counter
-        playerHp -= 10
-        result = f"You cast {playerSpell}... It was not effective! You take -10 HP."
+        playerHp -= DAMAGE
+        result = f"You cast {playerSpell}... It was not effective! You take -{DAMAGE} HP."
     else: # Player failed to cast anything
-        playerHp -= 10
-        result = f"You failed to cast a spell... You take -10 HP."
+        playerHp -= DAMAGE
+        result = f"You failed to cast a spell... You take -{DAMAGE} HP."
     return playerHp,mageHp,result
 
+def evaluate_spells (player_spells, mage_spells, player_hp, mage_hp, damage=DAMAGE):
+    ##"Batched evaluate_spell over arrays of spell codes and HP, one entry per duel"
+    ##"Returns (player_hp, mage_hp, countered) as new arrays"
+    player_spells, player_hp, mage_hp = np.asarray(player_spells), np.asarray(player_hp), np.asarray(mage_hp)
+    countered = (player_spells != 0) & (COUNTER_CODES[mage_spells] == player_spells)
+    # Damage in the HP arrays' own dtype, so small int arrays stay small
+    mage_hp = mage_hp - countered * mage_hp.dtype.type(damage)
+    player_hp = player_hp - ~countered * player_hp.dtype.type(damage)
+    return player_hp, mage_hp, countered
+
 def get_reaction_time (difficulty):
     return DIFFICULTY_LEVELS.get(difficulty, 1.5) # Default to medium if not found
 
@@ -35,6 +62,14 @@ def is_game_over (playerHp,mageHp ):
         return "mage"
     return None
 
-def get_random_spell():
-    import random
-    return random.choice(list(SPELL_COUNTERS.keys()))
+def game_over_codes (player_hp, mage_hp):
+    ##"Batched is_game_over: NOT_OVER, PLAYER_LOST or MAGE_LOST per duel"
+    codes = (np.asarray(mage_hp) <= 0).astype(np.uint8) * np.uint8(MAGE_LOST)
+    return np.where(np.asarray(player_hp) <= 0, np.uint8(PLAYER_LOST), codes)
+
+def get_random_spell(rng=random):
+    return rng.choice(SPELLS)
+
+def random_spells (rng, size):
+    ##"Codes of `size` random mage spells drawn from a numpy Generator"
+    return rng.integers(1, len(SPELL_CODES), size=size, dtype=np.uint8)
@@ -1,25 +1,60 @@
+import numpy as np
+
+TIP_IDS = [4, 8, 12, 16, 20] # Finger tip landmark IDs
+PIP_IDS = [tip_id - 2 for tip_id in TIP_IDS[1:]] # PIP joints of the non-thumb fingers
+THUMB_TOLERANCE = 0.02  # Small tolerance for thumb position
+FINGER_TOLERANCE = 0.01  # Small tolerance for finger positions
+
+# Spell codes used by the batched classifier (index into SPELL_NAMES)
+SPELL_NAMES = (None, "Fire", "Water", "Earth")
+
+# Finger patterns [Thumb, Index, Middle, Ring, Pinky] accepted for each spell
+SPELL_GESTURES = {
+    # Fire: Index and Middle up, others down (with some tolerance)
+    # Multiple acceptable Fire gestures for better reliability
+    "Fire": [
+        [0,1,1,0,0],  # Original: thumb down, index+middle up
+        [1,1,1,0,0],  # Alternative: thumb up, index+middle up
+        [0,1,1,1,0],  # Alternative: thumb down, index+middle+ring up
+        [1,1,1,1,0],  # Alternative: thumb up, index+middle+ring up
+    ],
+    "Water": [[1,1,1,1,1]],
+    "Earth": [[0,0,0,0,0]],
+}
+
+FINGER_BITS = np.array([1, 2, 4, 8, 16], dtype=np.uint8) # Thumb is bit 0, pinky is bit 4
+
+def fingers_to_mask (fingers):
+    ##"Packs a [Thumb, Index, Middle, Ring, Pinky] list into a 5-bit mask"
+    return sum(int(bool(up)) << i for i, up in enumerate(fingers))
+
+def _build_spell_table():
+    # 32-entry lookup table: finger mask -> spell code
+    table = np.zeros(32, dtype=np.uint8)
+    for spell, patterns in SPELL_GESTURES.items():
+        for fingers in patterns:
+            table[fingers_to_mask(fingers)] = SPELL_NAMES.index(spell)
+    return table
+
+SPELL_TABLE = _build_spell_table()
+
 def get_fingers_up (hand_landmarks):
     ##"Returns a list of booleans that indicate which fingers are up "
     ##"[Thumb, Index, Middle, Ring, Pinky]"
 
     fingers = []
 
-    TIP_IDS = [4, 8, 12, 16, 20] # Finger tip landmark IDs
-
     #Thumb (Compare X , NOT Y, Since thumbs goes sideways)
     # Add some tolerance for thumb detection
-    thumb_tolerance = 0.02  # Small tolerance for thumb position
-    if hand_landmarks.landmark[4].x < hand_landmarks.landmark[3].x - thumb_tolerance:
+    if hand_landmarks.landmark[4].x < hand_landmarks.landmark[3].x - THUMB_TOLERANCE:
         fingers.append(1)
     else:
         fingers.append(0)
 
     #Other fingers : tip highers than the pip join = finger Up
     # Add some tolerance for other fingers too
-    finger_tolerance = 0.01  # Small tolerance for finger positions
-
     for tip_id in TIP_IDS[1:]: # Skip thumb
-        if hand_landmarks.landmark[tip_id].y < hand_landmarks.landmark[tip_id - 2].y - finger_tolerance:
+        if hand_landmarks.landmark[tip_id].y < hand_landmarks.landmark[tip_id - 2].y - FINGER_TOLERANCE:
             fingers.append(1)
         else:
             fingers.append(0)
@@ -27,16 +62,32 @@ def get_fingers_up (hand_landmarks):
     return fingers
 
 def get_spells_from_fingers(fingers):
-    # Fire: Index and Middle up, others down (with some tolerance)
-    # Multiple acceptable Fire gestures for better reliability
-    if (fingers == [0,1,1,0,0] or  # Original: thumb down, index+middle up
-        fingers == [1,1,1,0,0] or  # Alternative: thumb up, index+middle up
-        fingers == [0,1,1,1,0] or  # Alternative: thumb down, index+middle+ring up
-        fingers == [1,1,1,1,0]):   # Alternative: thumb up, index+middle+ring up
-        return "Fire"
-    elif fingers == [1,1,1,1,1]:
-        return "Water"
-    elif fingers == [0,0,0,0,0]:
-        return "Earth"
-    else:
-        return None
\ No newline at end of file
+    # Look the finger pattern up in the precomputed spell table
+    if len(fingers) != 5:
+        return None
+    return SPELL_NAMES[SPELL_TABLE[fingers_to_mask(fingers)]]
+
+def landmarks_to_array (hand_landmarks_list):
+    ##"Converts MediaPipe hand landmarks into an (N, 21, 3) float32 array"
+    if not hand_landmarks_list:
+        return np.zeros((0, 21, 3), dtype=np.float32)
+    return np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in hand_landmarks_list],
+                    dtype=np.float32)
+
+def get_finger_masks (landmarks):
+    ##"Returns the 5-bit finger mask for every hand in a (..., 21, 3) landmark array"
+    ##"Same rules as get_fingers_up, evaluated for all hands (or frames) at once"
+    landmarks = np.asarray(landmarks)
+    # Thresholds in float64 like the per-hand rules, float32 rounding would flip fingers at the edge
+    thumb_up = landmarks[..., 4, 0] < landmarks[..., 3, 0].astype(np.float64) - THUMB_TOLERANCE
+    fingers_up = landmarks[..., TIP_IDS[1:], 1] < landmarks[..., PIP_IDS, 1].astype(np.float64) - FINGER_TOLERANCE
+    bits = np.concatenate([thumb_up[..., None], fingers_up], axis=-1)
+    return (bits * FINGER_BITS).sum(axis=-1, dtype=np.uint8)
+
+def classify_spells (landmarks):
+    ##"Returns spell codes (index into SPELL_NAMES) for a (..., 21, 3) landmark array"
+    return SPELL_TABLE[get_finger_masks(landmarks)]
+
+def spell_names (spell_codes):
+    ##"Converts spell codes back into spell names (None where no spell was detected)"
+    return [SPELL_NAMES[code] for code in np.ravel(spell_codes)]
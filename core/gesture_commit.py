@@ -0,0 +1,89 @@
+from collections import deque
+
+
+class GestureCommitter:
+    """Per-hand temporal voting that locks in a spell once it is stable.
+
+    Each frame, every tracked hand votes for the spell it shows (or None). A
+    spell is committed when one hand shows it for `frames_to_commit`
+    consecutive frames, or when its confidence-weighted share of that hand's
+    last `window` votes reaches `confidence_threshold` (counted once the hand
+    has cast `min_votes` votes). A steady gesture locks in through the streak,
+    a clearly leading one whose streak keeps getting broken by misdetections
+    through the vote share. Single-frame misdetections never commit on their
+    own, and once a spell is committed the round can be resolved straight away.
+    """
+
+    def __init__(self, frames_to_commit=4, confidence_threshold=0.75, window=6, min_votes=5):
+        self.frames_to_commit = frames_to_commit
+        self.confidence_threshold = confidence_threshold
+        self.window = window
+        self.min_votes = min(min_votes, window)
+        self.reset()
+
+    def reset(self):
+        """Forget all votes, e.g. at the start of a round"""
+        self.hands = {}  # hand id -> {"spell", "streak", "votes"}
+        self.committed_spell = None
+        self.committed_hand = None
+
+    def _state(self, hand_id):
+        state = self.hands.get(hand_id)
+        if state is None:
+            state = {"spell": None, "streak": 0, "votes": deque(maxlen=self.window)}
+            self.hands[hand_id] = state
+        return state
+
+    def update(self, hand_id, spell, confidence=1.0):
+        """Add one hand's vote for this frame. Returns the committed spell, if any"""
+        if self.committed_spell is not None:
+            return self.committed_spell
+
+        state = self._state(hand_id)
+        if spell is not None and spell == state["spell"]:
+            state["streak"] += 1
+        else:
+            state["spell"] = spell
+            state["streak"] = 1 if spell is not None else 0
+        state["votes"].append((spell, confidence))
+
+        if spell is not None and (state["streak"] >= self.frames_to_commit or
+                                  self.vote_share(hand_id, spell) >= self.confidence_threshold):
+            self.committed_spell = spell
+            self.committed_hand = hand_id
+        return self.committed_spell
+
+    def update_frame(self, observations):
+        """Vote with every hand seen this frame, as (hand_id, spell, confidence) tuples.
+
+        Hands tracked earlier but missing from this frame vote None, which
+        breaks their streak. Returns the committed spell, if any.
+        """
+        seen = set()
+        for hand_id, spell, confidence in observations:
+            seen.add(hand_id)
+            self.update(hand_id, spell, confidence)
+        for hand_id in list(self.hands):
+            if hand_id not in seen:
+                self.update(hand_id, None, 0.0)
+        return self.committed_spell
+
+    def vote_share(self, hand_id, spell):
+        """Confidence-weighted share of a hand's recent votes that went to a spell (0 before `min_votes`)"""
+        votes = self.hands[hand_id]["votes"] if hand_id in self.hands else ()
+        if len(votes) < self.min_votes:
+            return 0.0
+        return sum(conf for s, conf in votes if s == spell) / len(votes)
+
+    def leading_spell(self):
+        """Committed spell, or else the spell with the most confidence-weighted votes so far"""
+        if self.committed_spell is not None:
+            return self.committed_spell
+        totals = {}
+        for state in self.hands.values():
+            for spell, confidence in state["votes"]:
+                if spell is not None:
+                    totals[spell] = totals.get(spell, 0.0) + confidence
+        if not totals:
+            return None
+        return max(totals, key=totals.get)
@@ -0,0 +1,119 @@
+import cv2
+import numpy as np
+
+from core.performance_profiles import create_hands
+
+
+class HandRoiTracker:
+    """Runs hand inference on a downscaled crop around the last known hands.
+
+    Wraps a MediaPipe Hands instance and exposes the same process() call. When
+    hands were found in the previous frame, only a region around them (plus a
+    margin) is cropped, downscaled to at most `input_size` pixels and passed to
+    `roi_hands`. Landmarks are mapped back to full-frame normalized coordinates,
+    so callers see the same results as a full-frame search. Every
+    `full_frame_interval` frames, and on the frame after the hands were lost
+    inside the ROI, the full frame is searched with `hands` instead, so a
+    call never runs more than one inference.
+
+    The crop moves and changes size between calls, which would throw off
+    MediaPipe's own tracking, so `roi_hands` must be a separate instance in
+    static image mode (see for_profile). The tracker owns both instances
+    and close() closes them.
+    """
+
+    def __init__(self, hands, roi_hands, margin=0.25, input_size=256, min_roi_fraction=0.2,
+                 full_frame_interval=30):
+        self.hands = hands
+        self.roi_hands = roi_hands
+        self.margin = margin
+        self.input_size = input_size
+        self.min_roi_fraction = min_roi_fraction  # Smallest ROI side, as a fraction of the frame's short side
+        self.full_frame_interval = full_frame_interval
+
+        self.roi = None  # (x0, y0, x1, y1) in pixels, or None for a full-frame search
+        self.frames_since_full = 0
+        self.roi_frames = 0
+        self.full_frames = 0
+
+    def process(self, image_rgb):
+        frame_h, frame_w = image_rgb.shape[:2]
+
+        if self.roi is not None and self.frames_since_full < self.full_frame_interval:
+            results = self._process_roi(image_rgb, frame_w, frame_h)
+            self.roi_frames += 1
+            self.frames_since_full += 1
+            if results.multi_hand_landmarks:
+                self.roi = self._roi_from_landmarks(results.multi_hand_landmarks, frame_w, frame_h)
+            else:
+                # Hand lost inside the ROI, search the full frame on the next call
+                self.roi = None
+            return results
+
+        results = self.hands.process(image_rgb)
+        self.full_frames += 1
+        self.frames_since_full = 0
+        if results.multi_hand_landmarks:
+            self.roi = self._roi_from_landmarks(results.multi_hand_landmarks, frame_w, frame_h)
+        else:
+            self.roi = None
+        return results
+
+    def _process_roi(self, image_rgb, frame_w, frame_h):
+        x0, y0, x1, y1 = self.roi
+        roi_w, roi_h = x1 - x0, y1 - y0
+        crop = image_rgb[y0:y1, x0:x1]
+
+        scale = self.input_size / max(roi_w, roi_h)
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(1, int(roi_w * scale)), max(1, int(roi_h * scale))),
+                              interpolation=cv2.INTER_AREA)
+        else:
+            crop = np.ascontiguousarray(crop)
+
+        results = self.roi_hands.process(crop)
+        if results.multi_hand_landmarks:
+            # Map crop-normalized landmarks back to full-frame normalized coordinates
+            sx, sy = roi_w / frame_w, roi_h / frame_h
+            ox, oy = x0 / frame_w, y0 / frame_h
+            for hand in results.multi_hand_landmarks:
+                for lm in hand.landmark:
+                    lm.x = ox + lm.x * sx
+                    lm.y = oy + lm.y * sy
+                    lm.z = lm.z * sx  # z uses the same scale as x
+        return results
+
+    def _roi_from_landmarks(self, hand_landmarks, frame_w, frame_h):
+        """Square region around all hands, padded by the margin and clipped to the frame"""
+        xs = [lm.x for hand in hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in hand_landmarks for lm in hand.landmark]
+        x_min, x_max = min(xs) * frame_w, max(xs) * frame_w
+        y_min, y_max = min(ys) * frame_h, max(ys) * frame_h
+
+        side = max(x_max - x_min, y_max - y_min) * (1.0 + 2.0 * self.margin)
+        side = max(side, self.min_roi_fraction * min(frame_w, frame_h))
+        cx, cy = (x_min + x_max) / 2.0, (y_min + y_max) / 2.0
+
+        x0 = int(max(0, cx - side / 2.0))
+        y0 = int(max(0, cy - side / 2.0))
+        x1 = int(min(frame_w, cx + side / 2.0))
+        y1 = int(min(frame_h, cy + side / 2.0))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return (x0, y0, x1, y1)
+
+    @classmethod
+    def for_profile(cls, hands, profile, **kwargs):
+        """Tracker around `hands` with its own static-image instance for the crops, warmed up
+        so the first crop doesn't pay for graph setup and model loading"""
+        roi_hands = create_hands(profile, static_image_mode=True)
+        tracker = cls(hands, roi_hands, **kwargs)
+        roi_hands.process(np.zeros((tracker.input_size, tracker.input_size, 3), dtype=np.uint8))
+        return tracker
+
+    def stats(self):
+        return {"roi_frames": self.roi_frames, "full_frames": self.full_frames}
+
+    def close(self):
+        self.hands.close()
+        self.roi_hands.close()
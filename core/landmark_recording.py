@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Wizard Fight Landmark Recording
+Records a duel's hand landmarks (instead of raw video) to a compact,
+append-only binary file, and replays recordings through the gesture and game
+rules with no camera or hand model, faster than real time.
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+# Add the parent directory to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.gameLogic import SPELL_COUNTERS
+from core.gestureUtils import get_fingers_up, get_spells_from_fingers, landmarks_to_array, SPELL_NAMES
+
+# File layout (little-endian):
+#   header: magic, version, has_seed, seed, commit_frames, commit_confidence,
+#           early_resolve, commit window, commit min votes, difficulty length, difficulty
+#   then records, each starting with a one-byte type:
+#   FRAME:  timestamp f64, capture timestamp f64, hand count u8 (255: no input),
+#           handedness u8 x N, score f16 x N, landmarks f16 x N*21*3
+#   SPELL:  timestamp f64, round u16, spell code u8 (index into SPELL_NAMES),
+#           reaction window allowance f64
+#   FORFEIT: timestamp f64
+# Version 1 files have no capture timestamps or allowances.
+MAGIC = b"WZLM"
+VERSION = 2
+HEADER = struct.Struct("<4sBBqBfBBBB")
+FRAME = b"F"
+SPELL = b"S"
+FORFEIT = b"Q"
+FRAME_HEAD = struct.Struct("<ddB")
+SPELL_BODY = struct.Struct("<dHBd")
+FRAME_HEAD_V1 = struct.Struct("<dB")
+SPELL_BODY_V1 = struct.Struct("<dHB")
+TIMESTAMP = struct.Struct("<d")
+
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+UNKNOWN_HAND = 255  # Hand identified by its index in the frame
+NO_INPUT = 255  # Hand count of ticks that had no new frame to read
+
+RecordedFrame = namedtuple("RecordedFrame", "timestamp captured_at landmarks handedness scores")
+
+
+class LandmarkRecorder:
+    """Appends a duel's landmark frames and mage spells to a binary file.
+
+    Each frame costs 18 bytes plus 129 bytes per hand (float16 landmarks),
+    a tiny fraction of the video it was detected from.
+    """
+
+    def __init__(self, path, seed=None, difficulty="medium", commit_frames=4, commit_confidence=0.75,
+                 early_resolve=True, commit_window=6, commit_min_votes=5):
+        self.path = path
+        self.file = open(path, "wb")
+        name = difficulty.encode()
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed is not None, seed or 0, commit_frames,
+                                    commit_confidence, early_resolve, commit_window, commit_min_votes, len(name)))
+        self.file.write(name)
+        self.frames = 0
+
+    def write_frame(self, timestamp, hand_landmarks=None, observations=(), captured_at=None, has_input=True):
+        """Record one tick: its timestamps and the hands seen (MediaPipe landmarks or an (N, 21, 3) array)"""
+        if not has_input:
+            self.file.write(FRAME)
+            self.file.write(FRAME_HEAD.pack(timestamp, timestamp, NO_INPUT))
+            self.frames += 1
+            return
+        if hand_landmarks is None:
+            landmarks = np.zeros((0, 21, 3), dtype=np.float16)
+        elif isinstance(hand_landmarks, np.ndarray):
+            landmarks = hand_landmarks.astype(np.float16)
+        else:
+            landmarks = landmarks_to_array(hand_landmarks).astype(np.float16)
+
+        count = len(landmarks)
+        handedness = np.full(count, UNKNOWN_HAND, dtype=np.uint8)
+        scores = np.ones(count, dtype=np.float16)
+        for i, (hand_id, _, confidence) in enumerate(list(observations)[:count]):
+            handedness[i] = HANDEDNESS_CODES.get(hand_id, UNKNOWN_HAND)
+            scores[i] = confidence
+
+        self.file.write(FRAME)
+        self.file.write(FRAME_HEAD.pack(timestamp, timestamp if captured_at is None else captured_at, count))
+        if count:
+            self.file.write(handedness.tobytes())
+            self.file.write(scores.tobytes())
+            self.file.write(landmarks.tobytes())
+        self.frames += 1
+
+    def write_mage_spell(self, timestamp, round_num, spell, allowance=0.0):
+        self.file.write(SPELL)
+        self.file.write(SPELL_BODY.pack(timestamp, round_num, SPELL_NAMES.index(spell), allowance))
+        self.file.flush()  # Round boundaries are always on disk
+
+    def write_forfeit(self, timestamp):
+        self.file.write(FORFEIT)
+        self.file.write(TIMESTAMP.pack(timestamp))
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def read_recording(path):
+    """Return (header, records) for a recording. Records are RecordedFrame,
+    ("spell", timestamp, round, spell, allowance) or ("forfeit", timestamp) tuples in file order"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, has_seed, seed, commit_frames, commit_confidence, early_resolve, commit_window, \
+        commit_min_votes, name_len = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a landmark recording")
+    if version not in (1, VERSION):
+        raise ValueError(f"{path}: unsupported recording version {version}")
+    offset = HEADER.size
+    difficulty = data[offset:offset + name_len].decode()
+    offset += name_len
+    header = {"seed": seed if has_seed else None, "difficulty": difficulty, "commit_frames": commit_frames,
+              "commit_confidence": round(commit_confidence, 6), "early_resolve": bool(early_resolve),
+              "commit_window": commit_window, "commit_min_votes": commit_min_votes}
+
+    records = []
+    while offset < len(data):
+        kind = data[offset:offset + 1]
+        offset += 1
+        try:
+            if kind == FRAME:
+                if version == 1:
+                    timestamp, count = FRAME_HEAD_V1.unpack_from(data, offset)
+                    captured_at = timestamp
+                    offset += FRAME_HEAD_V1.size
+                else:
+                    timestamp, captured_at, count = FRAME_HEAD.unpack_from(data, offset)
+                    offset += FRAME_HEAD.size
+                if count == NO_INPUT:
+                    records.append(RecordedFrame(timestamp, captured_at, None, None, None))
+                    continue
+                if offset + count * (1 + 2 + 2 * 63) > len(data):
+                    raise struct.error("truncated frame")
+                handedness = np.frombuffer(data, np.uint8, count, offset)
+                offset += count
+                scores = np.frombuffer(data, np.float16, count, offset)
+                offset += 2 * count
+                landmarks = np.frombuffer(data, np.float16, count * 63, offset).reshape(count, 21, 3)
+                offset += 2 * count * 63
+                records.append(RecordedFrame(timestamp, captured_at, landmarks, handedness, scores))
+            elif kind == SPELL:
+                if version == 1:
+                    timestamp, round_num, code = SPELL_BODY_V1.unpack_from(data, offset)
+                    allowance = 0.0
+                    offset += SPELL_BODY_V1.size
+                else:
+                    timestamp, round_num, code, allowance = SPELL_BODY.unpack_from(data, offset)
+                    offset += SPELL_BODY.size
+                records.append(("spell", timestamp, round_num, SPELL_NAMES[code], allowance))
+            elif kind == FORFEIT:
+                (timestamp,) = TIMESTAMP.unpack_from(data, offset)
+                offset += TIMESTAMP.size
+                records.append(("forfeit", timestamp))
+            else:
+                raise ValueError(f"{path}: unknown record type {kind!r} at byte {offset - 1}")
+        except struct.error:
+            # Truncated last record (e.g. the game was killed mid-write), keep what is complete
+            print(f"Warning: {path} ends with a truncated record")
+            break
+    return header, records
+
+
+class _Landmark:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class _Hand:
+    """Recorded landmarks in the shape get_fingers_up expects from MediaPipe"""
+
+    def __init__(self, landmarks):
+        self.landmark = [_Landmark(x, y, z) for x, y, z in landmarks.tolist()]
+
+
+def recorded_hand_detector(frame):
+    """DuelSession detector for RecordedFrame input: runs the per-hand gesture rules"""
+    observations = []
+    hands = []
+    for i, landmarks in enumerate(frame.landmarks):
+        hand = _Hand(landmarks)
+        hands.append(hand)
+        spell = get_spells_from_fingers(get_fingers_up(hand))
+        code = int(frame.handedness[i])
+        hand_id = HANDEDNESS_LABELS.get(code, i)
+        observations.append((hand_id, spell, float(frame.scores[i])))
+    return observations, hands or None
+
+
+class _RecordedAllowance:
+    """Stands in for the live RenderLatencyCompensator, giving each round its recorded allowance"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def allowance(self):
+        return self.value
+
+
+def replay(path, log=None):
+    """Play a recording back through DuelSession (gesture rules, voting, evaluate_spell)
+    on the recorded clocks. Returns (header, sessions' round records, stats)"""
+    from core.duel_session import DuelSession, READY, GAME_OVER
+    from core.gesture_commit import GestureCommitter
+
+    header, records = read_recording(path)
+    mage_spells = deque()
+    # Spells past the end of the recording come from the recorded seed, like the live game
+    rng = random.Random(header["seed"])
+
+    allowance = _RecordedAllowance()
+
+    def pick_spell():
+        if not mage_spells:
+            allowance.value = 0.0
+            return rng.choice(list(SPELL_COUNTERS))
+        spell, allowance.value = mage_spells.popleft()
+        return spell
+
+    session = DuelSession(header["difficulty"], detector=recorded_hand_detector,
+                          committer=GestureCommitter(frames_to_commit=header["commit_frames"],
+                                                     confidence_threshold=header["commit_confidence"],
+                                                     window=header["commit_window"],
+                                                     min_votes=header["commit_min_votes"]),
+                          spell_picker=pick_spell, early_resolve=header["early_resolve"], log=log,
+                          latency=allowance)
+
+    duels = []
+    frames = 0
+    start = time.perf_counter()
+    first = last = None
+    for record in records:
+        timestamp = record.timestamp if isinstance(record, RecordedFrame) else record[1]
+        first = timestamp if first is None else first
+        last = timestamp
+        if isinstance(record, RecordedFrame):
+            session.tick(record if record.landmarks is not None else None, record.timestamp, record.captured_at)
+            frames += 1
+        elif record[0] == "spell":
+            _, _, round_num, spell, round_allowance = record
+            mage_spells.append((spell, round_allowance))
+            if round_num == 1 and session.phase in (READY, GAME_OVER):
+                if session.rounds:
+                    duels.append(session.rounds)
+                if session.phase == READY:
+                    session.start(timestamp)
+                else:
+                    session.restart(timestamp)
+        elif record[0] == "forfeit":
+            session.now = timestamp
+            session.forfeit()
+    if session.rounds:
+        duels.append(session.rounds)
+    elapsed = time.perf_counter() - start
+
+    recorded_seconds = last - first if records else 0.0
+    stats = {"frames": frames, "seconds": elapsed, "recorded_seconds": recorded_seconds,
+             "speedup": recorded_seconds / elapsed if elapsed > 0 else 0.0}
+    return header, duels, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a Wizard Fight landmark recording")
+    parser.add_argument("recording", help="File written with launch_game.py --record")
+    parser.add_argument("--verbose", action="store_true", help="Print the game log while replaying")
+    args = parser.parse_args()
+
+    header, duels, stats = replay(args.recording, log=print if args.verbose else None)
+    print(f"Recording: difficulty {header['difficulty']}, seed {header['seed']}")
+    for d, rounds in enumerate(duels, 1):
+        print(f"\nDuel {d}:")
+        for r in rounds:
+            print(f"  Round {r['round']}: mage {r['mage_spell']}, player {r['player_spell']} "
+                  f"-> player {r['player_hp']} HP, mage {r['mage_hp']} HP")
+    print(f"\nReplayed {stats['frames']} frames ({stats['recorded_seconds']:.1f}s recorded) "
+          f"in {stats['seconds']:.3f}s ({stats['speedup']:.0f}x real time)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
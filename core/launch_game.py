@@ -15,22 +15,21 @@ def main():
         # Add the parent directory to the path so we can import from ui
         sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         
-        # Import and run the main game
+        # Import the game, it starts when main() is called
         import ui.wizard_duel_game as wizard_duel_game
-        
-        # The game will automatically show the title screen first
-        # and then proceed with the selected difficulty
-        
     except ImportError as e:
         print(f"Error: Could not import required modules: {e}")
         print("Make sure all required packages are installed:")
         print("pip install opencv-python mediapipe numpy")
         return 1
+    
+    try:
+        # The game shows the title screen first
+        # and then proceeds with the selected difficulty
+        return wizard_duel_game.main()
     except Exception as e:
         print(f"Error running game: {e}")
         return 1
-    
-    return 0
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
@@ -1,11 +1,13 @@
 import cv2
 import mediapipe as mp
 from gestureUtils import get_fingers_up, get_spells_from_fingers
+from performance_profiles import get_profile, create_hands
 
 cap = cv2.VideoCapture(0)
 
 mp_hands = mp.solutions.hands
-hands = mp_hands.Hands()
+_, perf_profile = get_profile()  # Default profile, same settings as mp_hands.Hands()
+hands = create_hands(perf_profile)
 draw = mp.solutions.drawing_utils
 
 # Health Bar Configuration
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Wizard Fight Multi-Station Mode
+Runs several duel stations from one machine, one worker process per camera
+or video source. Each worker does its own capture, hand tracking, duel logic
+and GameDisplay rendering, so stations run on separate cores instead of
+sharing one interpreter.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+# Add the parent directory to the path so we can import from core and ui
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_source(source):
+    """Camera index for numeric sources, otherwise a video path or URL"""
+    return int(source) if source.isdigit() else source
+
+
+def prepare_animations(width, height):
+    """Decode the mage animations into the disk cache once, before any station starts.
+
+    Stations then only memory-map the cached clips instead of all decoding
+    the same videos at once on a first run.
+    """
+    from ui.animation_cache import AnimationCache, CACHE_DIR
+    from ui.game_display import ANIMATION_SOURCES
+
+    cache = AnimationCache(width, height, cache_dir=CACHE_DIR)
+    for name, path in ANIMATION_SOURCES.items():
+        cache.register(name, path)
+        cache.load(name)
+    cache.release()
+
+
+def run_station(station_id, source, args):
+    """Worker process: run one station until it is quit or its source ends. Returns its stats"""
+    from core.camera_capture import CameraCapture
+    from core.duel_session import DuelSession, HandSpellDetector, READY, GAME_OVER
+    from core.frame_scheduler import FrameScheduler
+    from core.gesture_commit import GestureCommitter
+    from core.hand_roi import HandRoiTracker
+    from core.performance_profiles import get_profile, create_hands
+    from core.startup import warm_up_hands
+    from ui.game_display import GameDisplay
+
+    name = f"Station {station_id}"
+    live = isinstance(source, int)
+    if live:
+        # Live cameras are read on a background thread, only the newest frame is used
+        cap = CameraCapture(source)
+        if cap.isOpened():
+            cap.start()
+    else:
+        # Video files are played frame by frame on their own clock, so runs are repeatable
+        cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        print(f"[{name}] Error: Could not open {source}")
+        return {"station": station_id, "source": source, "error": "could not open source"}
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    profile_name, perf_profile = get_profile(args.perf_profile, args.perf_config)
+    hands = create_hands(perf_profile)
+    warm_up_hands(hands)
+    hand_tracker = HandRoiTracker.for_profile(hands, perf_profile) if args.roi else hands
+
+    width, height = args.size
+    display = GameDisplay(frame_width=width, frame_height=height)
+    session = DuelSession(args.difficulty, detector=HandSpellDetector(hand_tracker, perf_profile),
+                          committer=GestureCommitter(), display=display,
+                          log=lambda *msg: print(f"[{name}]", *msg))
+    scheduler = FrameScheduler(target_fps=args.target_fps)
+    window = f"Wizard Duel - {name}"
+
+    if not args.show:
+        # Unattended stations start straight away
+        session.start(0.0 if not live else time.monotonic())
+
+    frames = 0
+    duels = 0
+    rounds = 0  # Rounds of earlier duels, session.rounds only covers the current one
+    start = time.perf_counter()
+    try:
+        while args.frames is None or frames < args.frames:
+            img = captured_at = None
+            if session.phase != GAME_OVER:
+                if live:
+                    success, img, captured_at = cap.read_latest()
+                else:
+                    success, img = cap.read()
+                if not success:
+                    break
+            now = time.monotonic() if live else frames / fps
+            session.tick(img, now, captured_at)
+            game_frame = session.render(img, scheduler.should_refresh())
+            frames += 1
+
+            if not args.show:
+                if session.finished:
+                    duels += 1
+                    rounds += len(session.rounds)
+                    session.restart(now)
+                continue
+
+            cv2.imshow(window, game_frame)
+            key = scheduler.wait_key()
+            if session.phase == READY:
+                if key != 0xFF:  # Any key starts the duel
+                    session.start(now)
+            elif session.phase == GAME_OVER:
+                if key == 13:  # Enter key - play again
+                    duels += 1
+                    rounds += len(session.rounds)
+                    session.restart(now)
+                elif key == ord('q'):
+                    break
+            elif key == ord('q'):
+                session.forfeit()
+    finally:
+        elapsed = time.perf_counter() - start
+        cap.release()
+        hand_tracker.close()
+        display.cleanup()
+        if args.show:
+            cv2.destroyWindow(window)
+
+    return {
+        "station": station_id,
+        "source": source,
+        "profile": profile_name,
+        "frames": frames,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "duels": duels,
+        "rounds": rounds + len(session.rounds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several Wizard Fight stations in parallel")
+    parser.add_argument("sources", nargs="+", help="Camera indices and/or video files, one per station")
+    parser.add_argument("--difficulty", default="medium", choices=["easy", "medium", "hard"])
+    parser.add_argument("--perf-profile", metavar="NAME", help="Hand tracking performance profile (default: quality)")
+    parser.add_argument("--perf-config", metavar="PATH", help="JSON file with additional performance profiles")
+    parser.add_argument("--roi", action="store_true", help="Track hands on a crop around the last seen hand")
+    parser.add_argument("--size", type=lambda s: tuple(int(v) for v in s.lower().split("x")), default=(1920, 1080),
+                        metavar="WxH", help="Display size of each station (default: 1920x1080)")
+    parser.add_argument("--target-fps", type=float, default=60.0, help="Frame rate each station is paced to")
+    parser.add_argument("--frames", type=int, help="Stop each station after this many frames")
+    parser.add_argument("--no-window", dest="show", action="store_false",
+                        help="Don't open windows: stations start immediately and run until their source ends")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per station)")
+    args = parser.parse_args()
+
+    sources = [parse_source(s) for s in args.sources]
+    workers = args.workers or len(sources)
+    print(f"Starting {len(sources)} stations on {workers} worker processes ({os.cpu_count()} cores)")
+    prepare_animations(*args.size)
+
+    # Spawned workers start clean instead of inheriting this process's threads and OpenCV state
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(run_station, i + 1, source, args): (i + 1, source)
+                   for i, source in enumerate(sources)}
+        for future in as_completed(futures):
+            station_id, source = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # One failing station doesn't take the others down
+                result = {"station": station_id, "source": source, "error": f"{type(e).__name__}: {e}"}
+            results.append(result)
+            if "error" in result:
+                print(f"Station {result['station']} ({result['source']}): {result['error']}")
+            else:
+                print(f"Station {result['station']} ({result['source']}): {result['frames']} frames, "
+                      f"{result['fps']:.1f} FPS, {result['rounds']} rounds")
+    elapsed = time.perf_counter() - start
+
+    total_frames = sum(r.get("frames", 0) for r in results)
+    print(f"\nAll stations: {total_frames} frames in {elapsed:.2f}s ({total_frames / elapsed:.1f} FPS combined)")
+    return 0 if all("error" not in r for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
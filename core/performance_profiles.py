@@ -0,0 +1,93 @@
+import json
+
+import cv2
+
+# Named MediaPipe Hands settings per deployment. "quality" matches mp_hands.Hands() defaults.
+# inference_width is the width frames are downscaled to before hand tracking (None = camera size).
+PERFORMANCE_PROFILES = {
+    "low": {
+        "model_complexity": 0,
+        "max_num_hands": 1,
+        "min_detection_confidence": 0.6,
+        "min_tracking_confidence": 0.6,
+        "inference_width": 320,
+    },
+    "balanced": {
+        "model_complexity": 0,
+        "max_num_hands": 1,
+        "min_detection_confidence": 0.5,
+        "min_tracking_confidence": 0.5,
+        "inference_width": 480,
+    },
+    "quality": {
+        "model_complexity": 1,
+        "max_num_hands": 2,
+        "min_detection_confidence": 0.5,
+        "min_tracking_confidence": 0.5,
+        "inference_width": None,
+    },
+}
+
+DEFAULT_PROFILE = "quality"
+
+def load_profiles(config_path=None):
+    """Built-in profiles, merged with any defined in a JSON config file.
+
+    The config maps profile names to settings. Settings left out of a profile
+    that shares a built-in name keep the built-in values, and new profiles
+    start from the default profile.
+    """
+    profiles = {name: dict(settings) for name, settings in PERFORMANCE_PROFILES.items()}
+    if config_path:
+        with open(config_path) as f:
+            config = json.load(f)
+        for name, settings in config.items():
+            base = profiles.get(name, PERFORMANCE_PROFILES[DEFAULT_PROFILE])
+            profiles[name] = {**base, **settings}
+    return profiles
+
+def get_profile(name=None, config_path=None):
+    """Return (name, settings) for a profile, falling back to the default if not found"""
+    profiles = load_profiles(config_path)
+    name = name or DEFAULT_PROFILE
+    if name not in profiles:
+        print(f"Warning: Unknown performance profile '{name}', using '{DEFAULT_PROFILE}'")
+        name = DEFAULT_PROFILE
+    return name, profiles[name]
+
+def create_hands(profile, static_image_mode=False):
+    """Build a MediaPipe Hands instance with a profile's settings.
+
+    With static_image_mode every image is searched from scratch instead of
+    tracking the hands found in the previous one (for unrelated images, such
+    as crops that move and resize between calls).
+    """
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(
+        static_image_mode=static_image_mode,
+        model_complexity=profile["model_complexity"],
+        max_num_hands=profile["max_num_hands"],
+        min_detection_confidence=profile["min_detection_confidence"],
+        min_tracking_confidence=profile["min_tracking_confidence"],
+    )
+
+def inference_size(width, height, profile):
+    """(width, height) a frame of this size is tracked at under a profile"""
+    target = profile.get("inference_width")
+    if not target or width <= target:
+        return width, height
+    return target, int(height * target / width)
+
+def resize_for_inference(image, profile, dst=None):
+    """Downscale a frame to the profile's inference width, keeping its aspect ratio.
+
+    Landmarks are normalized to the image size, so they need no remapping.
+    A `dst` array of the right size is written into instead of allocating.
+    """
+    h, w = image.shape[:2]
+    size = inference_size(w, h, profile)
+    if size == (w, h):
+        return image
+    if dst is not None and dst.shape[:2] == (size[1], size[0]):
+        return cv2.resize(image, size, dst=dst, interpolation=cv2.INTER_AREA)
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
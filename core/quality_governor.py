@@ -0,0 +1,109 @@
+from collections import namedtuple
+
+import numpy as np
+
+# One rung of the quality ladder. animation_fps / inference_fps of None mean every frame
+QualityLevel = namedtuple("QualityLevel", "render_scale animation_fps inference_fps")
+
+# Best first. Going down, the render resolution drops first (cheapest to notice),
+# then the animation frame rate, and only then the hand tracking rate
+QUALITY_LEVELS = (
+    QualityLevel(1.0, None, None),
+    QualityLevel(0.75, None, None),
+    QualityLevel(0.5, None, None),
+    QualityLevel(0.5, 30, None),
+    QualityLevel(0.5, 15, None),
+    QualityLevel(0.5, 15, 20),
+    QualityLevel(0.5, 15, 10),
+)
+
+
+def describe_change(old, new):
+    """Human-readable list of what differs between two quality levels"""
+    def rate(fps):
+        return "every frame" if fps is None else f"{fps} fps"
+
+    changes = []
+    if old.render_scale != new.render_scale:
+        changes.append(f"render scale {old.render_scale:.0%} -> {new.render_scale:.0%}")
+    if old.animation_fps != new.animation_fps:
+        changes.append(f"animation {rate(old.animation_fps)} -> {rate(new.animation_fps)}")
+    if old.inference_fps != new.inference_fps:
+        changes.append(f"hand tracking {rate(old.inference_fps)} -> {rate(new.inference_fps)}")
+    return ", ".join(changes)
+
+
+class QualityGovernor:
+    """Closed-loop quality control from measured frame times.
+
+    update() takes how long each frame took to produce (without the wait for
+    its deadline). Every `window` frames the 90th percentile is compared to
+    the frame budget: over budget steps one level down QUALITY_LEVELS, under
+    `headroom` times the budget for `raise_after` windows in a row steps one
+    level back up. A step up that has to be undone within `raise_after`
+    windows doubles the wait before the next try, so a level the machine
+    can't quite hold isn't retried every few seconds.
+    """
+
+    def __init__(self, target_fps=60.0, window=60, headroom=0.6, raise_after=3, levels=QUALITY_LEVELS,
+                 level=0, log=print):
+        self.frame_budget = 1.0 / target_fps
+        self.window = window
+        self.headroom = headroom
+        self.base_raise_after = raise_after
+        self.raise_after = raise_after
+        self.levels = levels
+        self.index = level
+        self.log = log or (lambda *_: None)
+        self.samples = []
+        self.headroom_windows = 0
+        self.windows_since_raise = None
+        self.changes = 0
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def update(self, frame_time):
+        """Add one frame time in seconds. Returns the new QualityLevel when it changed, else None"""
+        if frame_time is None:
+            return None
+        self.samples.append(frame_time)
+        if len(self.samples) < self.window:
+            return None
+
+        p90 = float(np.percentile(self.samples, 90))
+        self.samples.clear()
+        if self.windows_since_raise is not None:
+            self.windows_since_raise += 1
+
+        if p90 > self.frame_budget:
+            self.headroom_windows = 0
+            if self.index == len(self.levels) - 1:
+                return None
+            if self.windows_since_raise is not None and self.windows_since_raise <= self.base_raise_after:
+                self.raise_after = min(self.raise_after * 2, 64)  # The last step up didn't hold
+            self.windows_since_raise = None
+            return self._step(1, p90)
+
+        if p90 < self.frame_budget * self.headroom and self.index > 0:
+            self.headroom_windows += 1
+            if self.headroom_windows >= self.raise_after:
+                self.headroom_windows = 0
+                self.windows_since_raise = 0
+                return self._step(-1, p90)
+        else:
+            self.headroom_windows = 0
+        if self.windows_since_raise is not None and self.windows_since_raise > self.base_raise_after:
+            self.raise_after = self.base_raise_after  # The last step up held
+            self.windows_since_raise = None
+        return None
+
+    def _step(self, direction, p90):
+        old = self.level
+        self.index += direction
+        self.changes += 1
+        self.log(f"Quality {'down' if direction > 0 else 'up'} to level {self.index}: "
+                 f"{describe_change(old, self.level)} "
+                 f"(p90 frame time {p90 * 1000:.1f} ms, budget {self.frame_budget * 1000:.1f} ms)")
+        return self.level
@@ -0,0 +1,45 @@
+from collections import deque
+
+import numpy as np
+
+
+class RenderLatencyCompensator:
+    """Measures render latency (end of tick to imshow) and turns it into extra reaction time.
+
+    Player input is already judged by when its frame was captured, so slow
+    inference no longer costs reaction time. What is left is how long the game
+    takes to render a tick's result: the mage's attack shows up that much
+    after the round starts, and the player's own hand lags by as much.
+
+    add() takes one sample per frame: from when session.tick() returned to
+    right after the composed frame was handed to the window (cv2.imshow), on
+    the same clock. That is compositing plus presenting. Hand inference
+    (inside the tick) is left out so it isn't compensated twice, and so is
+    the frame scheduler's pacing wait after imshow, which is deliberate idle
+    time. Neither is the display's own lag after imshow, which can't be
+    measured from here. allowance() is the rolling median of the last `window` samples,
+    capped at `max_allowance` and rounded to `step` so the attack animation
+    only ever sees a handful of distinct durations.
+    """
+
+    def __init__(self, window=120, max_allowance=0.3, step=0.01):
+        self.max_allowance = max_allowance
+        self.step = step
+        self.samples = deque(maxlen=window)
+
+    def add(self, ticked_at, shown_at):
+        """One sample: `ticked_at` when the tick returned, `shown_at` right after the frame went to the window"""
+        self.samples.append(max(0.0, shown_at - ticked_at))
+
+    def latency(self):
+        """Median render latency in seconds, None before the first sample"""
+        if not self.samples:
+            return None
+        return float(np.median(self.samples))
+
+    def allowance(self):
+        """Seconds to add to the next round's reaction window"""
+        latency = self.latency()
+        if latency is None:
+            return 0.0
+        return round(min(self.max_allowance, round(latency / self.step) * self.step), 6)
@@ -0,0 +1,75 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class StartupLoader:
+    """Initializes slow resources on background threads during startup.
+
+    Each resource (camera, animations, hand model, ...) is built by its own
+    task, so they load at the same time and while the title screen is already
+    up instead of one after another before it. get() waits for a resource
+    only when it is actually needed. Timings for every task and the time to
+    interactive are kept for report().
+    """
+
+    def __init__(self, max_workers=4):
+        self.start_time = time.perf_counter()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="startup")
+        self.tasks = {}  # name -> Future
+        self.durations = {}  # name -> seconds the task took
+        self.milestones = {}  # name -> seconds since startup
+
+    def submit(self, name, fn, *args, **kwargs):
+        """Start building a resource in the background"""
+        def run():
+            task_start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.durations[name] = time.perf_counter() - task_start
+        self.tasks[name] = self.executor.submit(run)
+
+    def ready(self, name):
+        return self.tasks[name].done()
+
+    def pending(self):
+        """Names of the tasks still running"""
+        return [name for name, task in self.tasks.items() if not task.done()]
+
+    def get(self, name, timeout=None):
+        """Wait for a resource and return it. Re-raises the task's exception if it failed"""
+        return self.tasks[name].result(timeout)
+
+    def completed(self, name):
+        """A resource if its task has finished successfully, else None (never waits)"""
+        task = self.tasks.get(name)
+        if task is None or not task.done() or task.cancelled() or task.exception() is not None:
+            return None
+        return task.result()
+
+    def mark(self, milestone, at=None):
+        """Record when a startup milestone (e.g. the title screen showing) was reached"""
+        at = time.perf_counter() if at is None else at
+        self.milestones[milestone] = at - self.start_time
+        return self.milestones[milestone]
+
+    def report(self):
+        print("Startup timings:")
+        for name, seconds in self.durations.items():
+            print(f"  {name:<16}{seconds:6.2f}s")
+        for milestone, seconds in self.milestones.items():
+            print(f"  {milestone:<16}{seconds:6.2f}s after launch")
+
+    def shutdown(self):
+        """Stop accepting tasks, dropping any that haven't started yet"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def warm_up_hands(hands, width=640, height=480, passes=2):
+    """Run inference on a blank frame so the first real frame doesn't pay for
+    graph setup and model loading"""
+    dummy = np.zeros((height, width, 3), dtype=np.uint8)
+    for _ in range(passes):
+        hands.process(dummy)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import from core and ui like the scripts do
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,111 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from ui import animation_cache
+from ui.animation_cache import AnimationCache
+
+
+def write_clip(path, frames=12, size=(64, 48)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 24.0, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), i * 20, dtype=np.uint8))
+    writer.release()
+
+
+def test_concurrent_decodes_into_one_cache_dir(tmp_path):
+    source = tmp_path / "clip.avi"
+    write_clip(source)
+    cache_dir = tmp_path / "cache"
+
+    # Separate caches (like separate station processes) share no locks, only the directory
+    results = []
+
+    def decode():
+        cache = AnimationCache(32, 24, cache_dir=str(cache_dir))
+        cache.register("clip", str(source))
+        try:
+            results.append(len(cache.get_clip("clip")))
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=decode) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [12, 12, 12]
+    assert sorted(os.listdir(cache_dir)) == ["clip_32x24.npy", "manifest.json"]
+
+
+def test_source_is_hashed_again_only_when_it_changes(tmp_path, monkeypatch):
+    source = tmp_path / "clip.avi"
+    write_clip(source)
+    cache_dir = str(tmp_path / "cache")
+    first = AnimationCache(32, 24, cache_dir=cache_dir)
+    first.register("clip", str(source))
+    assert len(first.get_clip("clip")) == 12
+
+    hashed = []
+    real_sha256 = animation_cache.file_sha256
+    monkeypatch.setattr(animation_cache, "file_sha256", lambda path: hashed.append(path) or real_sha256(path))
+
+    def reopen():
+        cache = AnimationCache(32, 24, cache_dir=cache_dir)
+        cache.register("clip", str(source))
+        return cache.check("clip")
+
+    frames, problem = reopen()
+    assert problem is None and len(frames) == 12 and hashed == []
+
+    stat = os.stat(source)
+    os.utime(source, (stat.st_atime, stat.st_mtime + 10))  # Touched, same contents
+    frames, problem = reopen()
+    assert problem is None and len(hashed) == 1
+    frames, problem = reopen()
+    assert problem is None and len(hashed) == 1  # New time recorded, no second hash
+
+    data = bytearray(source.read_bytes())
+    data[-1] ^= 0xFF
+    source.write_bytes(bytes(data))
+    os.utime(source, (stat.st_atime, stat.st_mtime + 20))
+    frames, problem = reopen()
+    assert frames is None and problem == "source video changed"
+
+
+def test_resized_frames_reuse_one_buffer_per_size(tmp_path):
+    source = tmp_path / "clip.avi"
+    write_clip(source)
+    cache = AnimationCache(32, 24)
+    cache.register("clip", str(source))
+    clip = cache.get_clip("clip")
+
+    first = cache.get_frame("clip", 1, (16, 12))
+    assert np.array_equal(first, cv2.resize(clip[1], (16, 12)))
+    assert cache.get_frame("clip", 1, (16, 12)) is first
+
+    second = cache.get_frame("clip", 5, (16, 12))
+    assert second is first  # Resized into the same memory
+    assert np.array_equal(second, cv2.resize(clip[5], (16, 12)))
+    assert cache.get_frame("clip", 5, (8, 6)).shape == (6, 8, 3)
+
+
+def test_memory_mapped_clips_count_against_the_budget(tmp_path):
+    for name in ("a", "b"):
+        write_clip(tmp_path / f"{name}.avi")
+    clip_bytes = 12 * 24 * 32 * 3
+    # Room for one clip
+    cache = AnimationCache(32, 24, memory_budget_mb=1.5 * clip_bytes / (1024 * 1024),
+                           cache_dir=str(tmp_path / "cache"))
+    for name in ("a", "b"):
+        cache.register(name, str(tmp_path / f"{name}.avi"))
+
+    assert isinstance(cache.get_clip("a"), np.memmap)
+    assert cache.memory_in_use() == clip_bytes
+    cache.get_clip("b")
+    assert not cache.is_loaded("a") and cache.is_loaded("b")
+    assert cache.memory_in_use() == clip_bytes
+    assert len(cache.get_clip("a")) == 12  # Reopened from disk
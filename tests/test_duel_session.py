@@ -0,0 +1,48 @@
+from core.duel_session import ATTACK, DuelSession
+from core.gesture_commit import GestureCommitter
+
+
+class CountingDetector:
+    """Detector that sees one hand showing `spell` in every frame, and counts its calls"""
+
+    def __init__(self, spell="Water"):
+        self.spell = spell
+        self.calls = 0
+
+    def __call__(self, frame):
+        self.calls += 1
+        return [("Right", self.spell, 1.0)], None
+
+
+def make_session(detector):
+    return DuelSession("easy", detector=detector, committer=GestureCommitter(frames_to_commit=4),
+                       spell_picker=lambda: "Fire", log=None)
+
+
+def test_repeated_camera_frame_is_voted_once():
+    detector = CountingDetector()
+    session = make_session(detector)
+    session.start(0.0)
+
+    # The loop ticks four times per camera frame, all with the same capture time
+    frame = object()
+    for tick in range(8):
+        session.tick(frame, 0.01 * (tick + 1), captured_at=0.005)
+
+    assert detector.calls == 1
+    assert session.committer.hands["Right"]["streak"] == 1
+    assert session.committer.committed_spell is None
+    assert session.phase == ATTACK
+
+
+def test_new_camera_frames_advance_the_streak():
+    detector = CountingDetector()
+    session = make_session(detector)
+    session.start(0.0)
+
+    frame = object()
+    for tick in range(4):
+        session.tick(frame, 0.04 * (tick + 1), captured_at=0.035 * (tick + 1))
+
+    assert detector.calls == 4
+    assert session.committer.committed_spell == "Water"
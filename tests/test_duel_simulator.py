@@ -0,0 +1,50 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from core.duel_session import counter_player, simulate
+from core.duel_simulator import PlayerModel, simulate_duels
+from core.gameLogic import (
+    MAGE_LOST,
+    NOT_OVER,
+    PLAYER_LOST,
+    SPELL_CODES,
+    SPELLS,
+    evaluate_spell,
+    evaluate_spells,
+    game_over_codes,
+    is_game_over,
+)
+
+GAME_OVER_CODES = {None: NOT_OVER, "player": PLAYER_LOST, "mage": MAGE_LOST}
+
+
+def test_batched_rules_match_evaluate_spell_for_every_spell_pair():
+    pairs = list(itertools.product([None, *SPELLS], SPELLS))
+    hp = [(100, 100), (10, 50), (50, 10), (10, 10)]
+    cases = [(player, mage, player_hp, mage_hp) for player, mage in pairs for player_hp, mage_hp in hp]
+
+    player_hp, mage_hp, _ = evaluate_spells(
+        np.array([SPELL_CODES[player] for player, _, _, _ in cases], dtype=np.uint8),
+        np.array([SPELL_CODES[mage] for _, mage, _, _ in cases], dtype=np.uint8),
+        np.array([player_hp for _, _, player_hp, _ in cases], dtype=np.int16),
+        np.array([mage_hp for _, _, _, mage_hp in cases], dtype=np.int16))
+    over = game_over_codes(player_hp, mage_hp)
+
+    for i, (player, mage, p_hp, m_hp) in enumerate(cases):
+        expected_player_hp, expected_mage_hp, _ = evaluate_spell(player, mage, p_hp, m_hp)
+        assert (player_hp[i], mage_hp[i]) == (expected_player_hp, expected_mage_hp), (player, mage)
+        assert over[i] == GAME_OVER_CODES[is_game_over(expected_player_hp, expected_mage_hp)]
+
+
+@pytest.mark.parametrize("difficulty, accuracy", [("medium", 0.5), ("hard", 0.6)])
+def test_vectorized_win_rate_matches_the_session(difficulty, accuracy):
+    # The same player both ways: shows its spell 0.3 s into every round
+    session = simulate(1000, difficulty, seed=1,
+                       player=lambda rng: counter_player(accuracy=accuracy, delay=0.3, rng=rng))
+    vectorized = simulate_duels(100_000, difficulty, player=PlayerModel(accuracy, 0.3, 0.0), seed=1)
+
+    # About three standard errors of the 1000 session duels
+    assert abs(session["player_wins"] / 1000 - vectorized["player_won"].mean()) < 0.05
+    assert abs(session["rounds"] / 1000 - vectorized["rounds"].mean()) < 1.0
@@ -0,0 +1,38 @@
+from core.gesture_commit import GestureCommitter
+
+
+def vote(committer, spells, confidence=0.95):
+    """Vote with one hand, returning the streak and committed spell after each vote"""
+    history = []
+    for spell in spells:
+        committed = committer.update("Right", spell, confidence)
+        history.append((committer.hands["Right"]["streak"], committed))
+    return history
+
+
+def test_steady_gesture_commits_through_streak():
+    committer = GestureCommitter()
+    history = vote(committer, ["Fire"] * 4)
+    assert [committed for _, committed in history] == [None, None, None, "Fire"]
+
+
+def test_noisy_leading_gesture_commits_through_vote_share():
+    committer = GestureCommitter()
+    # A misdetection every third frame keeps breaking the streak
+    history = vote(committer, ["Fire", "Fire", "Water", "Fire", "Fire"])
+    streak, committed = history[-1]
+    assert committed == "Fire"
+    assert streak < committer.frames_to_commit
+    assert all(committed is None for _, committed in history[:-1])
+
+
+def test_single_misdetection_does_not_commit():
+    committer = GestureCommitter()
+    history = vote(committer, [None, "Earth", None, None, None, None])
+    assert all(committed is None for _, committed in history)
+
+
+def test_split_votes_do_not_commit():
+    committer = GestureCommitter()
+    history = vote(committer, ["Fire", "Water", "Fire", "Water", "Fire", "Water"])
+    assert all(committed is None for _, committed in history)
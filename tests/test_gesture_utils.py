@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.gestureUtils import (
+    FINGER_TOLERANCE,
+    PIP_IDS,
+    SPELL_NAMES,
+    THUMB_TOLERANCE,
+    TIP_IDS,
+    classify_spells,
+    get_fingers_up,
+    get_spells_from_fingers,
+    landmarks_to_array,
+)
+
+
+def as_mediapipe(hands):
+    """(N, 21, 3) array -> objects shaped like MediaPipe's hand landmark lists"""
+    return [SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in hand])
+            for hand in hands]
+
+
+def scalar_spells(hands):
+    return [get_spells_from_fingers(get_fingers_up(hand)) for hand in as_mediapipe(hands)]
+
+
+def test_batched_classifier_matches_per_hand_rules():
+    rng = np.random.default_rng(4)
+    hands = rng.random((2000, 21, 3), dtype=np.float32)
+    spells = [SPELL_NAMES[code] for code in classify_spells(hands)]
+    assert spells == scalar_spells(hands)
+    assert set(spells) == set(SPELL_NAMES)  # Every spell (and no spell) came up
+
+
+def test_batched_classifier_matches_at_the_tolerance_edges():
+    rng = np.random.default_rng(5)
+    hands = rng.random((2000, 21, 3), dtype=np.float32)
+    # Put tips within a hair of the tolerance around their joints
+    nudge = rng.choice(np.array([-1e-6, 0.0, 1e-6], dtype=np.float32), size=(2000, 5))
+    hands[:, 4, 0] = hands[:, 3, 0] - np.float32(THUMB_TOLERANCE) + nudge[:, 0]
+    hands[:, TIP_IDS[1:], 1] = hands[:, PIP_IDS, 1] - np.float32(FINGER_TOLERANCE) + nudge[:, 1:]
+    assert [SPELL_NAMES[code] for code in classify_spells(hands)] == scalar_spells(hands)
+
+
+def test_landmarks_to_array_round_trips():
+    hands = np.random.default_rng(6).random((3, 21, 3), dtype=np.float32)
+    assert np.array_equal(landmarks_to_array(as_mediapipe(hands)), hands)
+    assert landmarks_to_array(None).shape == (0, 21, 3)
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.hand_roi import HandRoiTracker
+
+
+def hand_at(x, y):
+    return SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=0.0) for _ in range(21)])
+
+
+class ScriptedHands:
+    """Stands in for MediaPipe Hands: returns the queued hands (or none) and records each input size"""
+
+    def __init__(self, *found):
+        self.found = list(found)
+        self.calls = []
+
+    def process(self, image):
+        self.calls.append(image.shape[:2])
+        hands = self.found.pop(0) if self.found else None
+        return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=None)
+
+    def close(self):
+        pass
+
+
+def test_roi_miss_defers_full_frame_search():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    full = ScriptedHands([hand_at(0.5, 0.5)], None)
+    roi = ScriptedHands(None)
+    tracker = HandRoiTracker(full, roi)
+
+    tracker.process(frame)  # Full frame finds the hand
+    assert tracker.roi is not None
+
+    results = tracker.process(frame)  # Lost inside the crop
+    assert not results.multi_hand_landmarks
+    assert len(full.calls) == 1 and len(roi.calls) == 1  # One inference per call
+    assert tracker.roi is None
+
+    tracker.process(frame)  # The next call searches the full frame
+    assert len(full.calls) == 2 and len(roi.calls) == 1
+
+
+def test_crops_go_to_the_roi_model_and_map_back():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    full = ScriptedHands([hand_at(0.5, 0.5)])
+    roi = ScriptedHands([hand_at(0.5, 0.5)])
+    tracker = HandRoiTracker(full, roi)
+
+    tracker.process(frame)
+    results = tracker.process(frame)
+    assert roi.calls and roi.calls[0] != (480, 640)
+    # The middle of a crop centered on the hand is the middle of the frame
+    lm = results.multi_hand_landmarks[0].landmark[0]
+    assert abs(lm.x - 0.5) < 0.01 and abs(lm.y - 0.5) < 0.01
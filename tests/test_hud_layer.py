@@ -0,0 +1,34 @@
+import cv2
+import numpy as np
+
+from ui.hud_layer import HudLayer
+
+
+def render_label(surface, text, x):
+    surface.put_text(text, (x + 10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3, cv2.LINE_AA)
+
+
+def render_panel(surface, text, x):
+    surface.rectangle((x, 10), (x + 200, 60), (40, 40, 40), -1)
+    render_label(surface, text, x)
+
+
+def test_composite_matches_drawing_on_the_frame():
+    hud = HudLayer(320, 120)
+    hud.add_widget("label", render_label, "Fire", 20)
+    hud.update("label", "Water", 60)  # Redraws both the old and the new area
+    frame = np.random.default_rng(0).integers(0, 256, (120, 320, 3), dtype=np.uint8)
+
+    expected = frame.copy()
+    cv2.putText(expected, "Water", (70, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3, cv2.LINE_AA)
+    hud.composite(frame)
+
+    # Anti-aliased edges keep their partial coverage instead of being cut to on/off
+    assert np.abs(frame.astype(np.int16) - expected).max() <= 1
+
+
+def test_overlapping_widgets_are_blended_once():
+    hud = HudLayer(320, 120)
+    hud.add_widget("back", render_panel, "A", 20)
+    hud.add_widget("front", render_panel, "B", 120)
+    assert hud.regions == [hud.bbox]
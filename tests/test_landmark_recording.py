@@ -0,0 +1,20 @@
+import numpy as np
+
+from core.landmark_recording import LandmarkRecorder, read_recording
+
+
+def test_header_keeps_commit_settings(tmp_path):
+    path = tmp_path / "duel.wzlm"
+    recorder = LandmarkRecorder(str(path), seed=7, difficulty="hard", commit_frames=3, commit_confidence=0.8,
+                                commit_window=5, commit_min_votes=4)
+    recorder.write_frame(0.1, np.zeros((1, 21, 3), dtype=np.float32), [("Left", "Fire", 0.9)])
+    recorder.write_frame(0.2, has_input=False)
+    recorder.close()
+
+    header, records = read_recording(str(path))
+    assert header["seed"] == 7
+    assert header["difficulty"] == "hard"
+    assert (header["commit_frames"], header["commit_window"], header["commit_min_votes"]) == (3, 5, 4)
+    assert len(records) == 2
+    assert records[0].landmarks.shape == (1, 21, 3) and records[0].handedness[0] == 0
+    assert records[1].landmarks is None  # A tick without a new frame
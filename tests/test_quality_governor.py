@@ -0,0 +1,56 @@
+from core.quality_governor import QUALITY_LEVELS, QualityGovernor
+
+SLOW = 0.030  # Over the 60 fps budget
+FAST = 0.005  # Well under 60% of it
+
+
+def run(governor, frame_time, windows):
+    """Feed `windows` windows of one frame time, returning the level indexes it changed to"""
+    changes = []
+    for _ in range(windows * governor.window):
+        if governor.update(frame_time) is not None:
+            changes.append(governor.index)
+    return changes
+
+
+def test_steps_down_the_ladder_one_level_per_slow_window():
+    governor = QualityGovernor(target_fps=60.0, window=10, log=None)
+    assert run(governor, SLOW, 3) == [1, 2, 3]
+    assert run(governor, SLOW, len(QUALITY_LEVELS)) == list(range(4, len(QUALITY_LEVELS)))
+    assert governor.level == QUALITY_LEVELS[-1]  # Stays at the bottom
+
+
+def test_steps_up_after_sustained_headroom():
+    governor = QualityGovernor(target_fps=60.0, window=10, raise_after=3, level=3, log=None)
+    assert run(governor, FAST, 2) == []
+    assert run(governor, FAST, 1) == [2]
+    assert run(governor, FAST, 6) == [1, 0]
+    assert run(governor, FAST, 3) == []  # Already at the top
+
+
+def test_frame_times_in_between_hold_the_level():
+    governor = QualityGovernor(target_fps=60.0, window=10, level=2, log=None)
+    assert run(governor, 0.8 / 60.0, 10) == []
+
+
+def test_backs_off_after_a_step_up_that_does_not_hold():
+    governor = QualityGovernor(target_fps=60.0, window=10, raise_after=3, level=2, log=None)
+    assert run(governor, FAST, 3) == [1]
+    assert run(governor, SLOW, 1) == [2]  # Too much for level 1
+    assert governor.raise_after == 6
+
+    # Twice the headroom is needed before trying again, and another failure doubles it again
+    assert run(governor, FAST, 5) == []
+    assert run(governor, FAST, 1) == [1]
+    assert run(governor, SLOW, 1) == [2]
+    assert governor.raise_after == 12
+
+
+def test_a_step_up_that_holds_resets_the_backoff():
+    governor = QualityGovernor(target_fps=60.0, window=10, raise_after=3, level=2, log=None)
+    run(governor, FAST, 3)
+    run(governor, SLOW, 1)
+    assert governor.raise_after == 6
+    assert run(governor, FAST, 6) == [1]
+    assert run(governor, 0.8 / 60.0, 4) == []  # Level 1 holds past raise_after windows
+    assert governor.raise_after == 3
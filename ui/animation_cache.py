@@ -0,0 +1,363 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from core.frame_buffers import ensure_buffer
+
+ASSETS_DIR = "Assets"  # Source videos
+CACHE_DIR = os.path.join(ASSETS_DIR, "cache")  # Decoded clips and their manifest, also what core/build_assets.py fills
+MANIFEST_NAME = "manifest.json"
+
+_manifest_lock = threading.Lock()  # Manifest read-modify-write within one process
+
+
+def clip_key(name, width, height):
+    return f"{name}_{width}x{height}"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_fingerprint(path):
+    """Size, modification time and SHA-256 of a source video, used to tell whether a cached clip is stale"""
+    stat = os.stat(path)
+    return {"source_bytes": stat.st_size, "source_mtime": stat.st_mtime, "source_sha256": file_sha256(path)}
+
+
+def check_source(entry, source_path):
+    """None if a cached clip's manifest entry still matches its source video, else why not.
+
+    Size and modification time are compared first; the video is only hashed
+    when the size matches but the time moved (e.g. it was copied or touched).
+    Same contents then update the entry's time so the next check is cheap
+    again, and the return value is "touched" so the caller can save it.
+    """
+    if not source_path or not os.path.exists(source_path):
+        return None  # Playing from the cache alone, e.g. on a booth without the source videos
+    stat = os.stat(source_path)
+    if stat.st_size != entry.get("source_bytes"):
+        return "source video changed"
+    if stat.st_mtime == entry.get("source_mtime"):
+        return None
+    if file_sha256(source_path) != entry.get("source_sha256"):
+        return "source video changed"
+    entry["source_mtime"] = stat.st_mtime
+    return "touched"
+
+
+def load_manifest(cache_dir):
+    """Clip entries of a cache directory, {} if it has no (readable) manifest"""
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f).get("clips", {})
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read {path}: {e}")
+        return {}
+
+
+def save_manifest_entry(cache_dir, key, entry):
+    """Add or replace one clip's entry, keeping entries other processes wrote in the meantime"""
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    with _manifest_lock:
+        clips = load_manifest(cache_dir)
+        clips[key] = entry
+        fd, tmp_path = tempfile.mkstemp(prefix=MANIFEST_NAME + ".", suffix=".tmp", dir=cache_dir)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": 2, "clips": clips}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    return clips
+
+
+def open_clip(cache_dir, entry):
+    """Memory-map a cached clip after checking it against its manifest entry.
+    Returns (frames, None), or (None, reason) if it can't be used"""
+    frames_path = os.path.join(cache_dir, entry["file"])
+    try:
+        frames = np.load(frames_path, mmap_mode="r")
+    except (OSError, ValueError) as e:
+        return None, f"unreadable frames: {e}"
+    expected = (entry["frame_count"], entry["height"], entry["width"], 3)
+    if frames.shape != expected or frames.dtype != np.uint8:
+        return None, f"frames are {frames.shape} {frames.dtype}, manifest says {expected} uint8"
+    return frames, None
+
+
+def disk_usage(cache_dir):
+    """Bytes taken by the files in a cache directory"""
+    if not os.path.isdir(cache_dir):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(cache_dir) if entry.is_file())
+
+
+class AnimationCache:
+    """Decodes animation clips once at a fixed display size and serves frames by index.
+
+    Clips are kept either fully in RAM or, when a cache directory is given, in
+    memory-mapped .npy files on disk so later runs skip decoding entirely.
+    Loaded clips are tracked against a memory budget and the least recently
+    used clip is evicted when a new one does not fit. Memory-mapped clips
+    count at their full size too: playing one pages in every frame, and
+    evicting it unmaps them (it is reopened from disk, not decoded, when
+    needed again).
+    The cache directory has a manifest with each clip's fps, frame count, size
+    and source video fingerprint, so cached clips load without opening the
+    video; core/build_assets.py fills the same directory ahead of time.
+
+    One cache can be shared by every screen (title screen and game): each
+    clip is decoded once at the cache's size, and callers that need another
+    size pass it to get_frame() and get that one frame resized.
+    Loading is thread-safe, so clips can be preloaded on a background thread
+    while another screen is already playing from the same cache.
+    """
+
+    def __init__(self, width, height, memory_budget_mb=4096, cache_dir=None):
+        self.width = width
+        self.height = height
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.cache_dir = cache_dir
+
+        self.sources = {}  # name -> video path
+        self.metadata = {}  # name -> {"fps": ..., "frame_count": ...}
+        self.clips = OrderedDict()  # name -> frames array, in LRU order
+        self.scaled = {}  # (name, size) -> (index, buffer), last frame served at a non-native size
+
+        self.lock = threading.Lock()  # Guards the clip table
+        self.load_locks = {}  # name -> lock held while that clip is being decoded
+
+        self.manifest = {}  # clip key -> manifest entry
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.manifest = load_manifest(self.cache_dir)
+
+    def register(self, name, path):
+        """Register a clip so it can be loaded (and reloaded after eviction) by name"""
+        self.sources[name] = path
+
+    def load(self, name):
+        """Make sure a clip is resident, decoding it if needed. Returns True on success"""
+        return self.get_clip(name) is not None
+
+    def get_clip(self, name):
+        """Return the (frames, height, width, 3) array for a clip, or None if unavailable"""
+        with self.lock:
+            if name in self.clips:
+                self.clips.move_to_end(name)
+                return self.clips[name]
+            path = self.sources.get(name)
+            if path is None:
+                return None
+            load_lock = self.load_locks.setdefault(name, threading.Lock())
+
+        # Only one thread decodes a clip; others wait for it and reuse the result
+        with load_lock:
+            with self.lock:
+                if name in self.clips:
+                    return self.clips[name]
+
+            frames = self._load_frames(name, path)
+            if frames is None:
+                return None
+
+            with self.lock:
+                self._make_room(frames.nbytes, keep=name)
+                self.clips[name] = frames
+            return frames
+
+    def is_loaded(self, name):
+        return name in self.clips
+
+    def get_frame(self, name, index, size=None):
+        """Return a single frame of a clip (wrapping around), or None if unavailable.
+
+        `size` is an optional (width, height). Frames at the cache's own size are
+        returned straight from the cache and must not be drawn on; other sizes
+        are resized on demand into one preallocated buffer per clip and size,
+        so repeated requests for the same frame are free and new frames don't
+        allocate. A resized frame is overwritten by the next request for
+        another frame of that clip at that size; copy it to keep it longer.
+        """
+        clip = self.get_clip(name)
+        if clip is None or len(clip) == 0:
+            return None
+        index %= len(clip)
+        if size is None or tuple(size) == (self.width, self.height):
+            return clip[index]
+
+        size = tuple(size)
+        key = (name, size)
+        cached = self.scaled.get(key)
+        if cached is not None and cached[0] == index:
+            return cached[1]
+        buffer = ensure_buffer(cached[1] if cached else None, (size[1], size[0], 3))
+        cv2.resize(clip[index], size, dst=buffer)
+        self.scaled[key] = (index, buffer)
+        return buffer
+
+    def frame_count(self, name):
+        meta = self.metadata.get(name)
+        return meta["frame_count"] if meta else 0
+
+    def fps(self, name):
+        meta = self.metadata.get(name)
+        return meta["fps"] if meta else 0.0
+
+    def memory_in_use(self):
+        """Bytes of currently loaded clips, memory-mapped ones included"""
+        return sum(clip.nbytes for clip in self.clips.values())
+
+    def evict(self, name):
+        """Drop a loaded clip. It will be reloaded on next access"""
+        with self.lock:
+            self.clips.pop(name, None)
+            self._drop_scaled(name)
+
+    def release(self):
+        """Drop all loaded clips"""
+        with self.lock:
+            self.clips.clear()
+            self.scaled.clear()
+
+    def _drop_scaled(self, name):
+        for key in [key for key in self.scaled if key[0] == name]:
+            del self.scaled[key]
+
+    def _make_room(self, needed, keep=None):
+        """Evict least recently used clips until `needed` more bytes fit in the budget"""
+        for name in list(self.clips):
+            if self.memory_in_use() + needed <= self.memory_budget:
+                break
+            if name == keep:
+                continue
+            print(f"Animation cache: evicting '{name}' to stay within memory budget")
+            self.clips.pop(name)
+            self._drop_scaled(name)
+        if needed > self.memory_budget:
+            print(f"Warning: animation '{keep}' alone exceeds the animation memory budget")
+
+    def _cache_path(self, name):
+        return os.path.join(self.cache_dir, f"{clip_key(name, self.width, self.height)}.npy")
+
+    def check(self, name):
+        """Open a registered clip from the cache directory if it is up to date.
+        Returns (frames, None), or (None, reason) if it has to be decoded"""
+        key = clip_key(name, self.width, self.height)
+        entry = self.manifest.get(key)
+        if entry is None:
+            return None, "not cached"
+        problem = check_source(entry, self.sources.get(name))
+        if problem == "touched":
+            self.manifest = save_manifest_entry(self.cache_dir, key, entry)
+        elif problem is not None:
+            return None, problem
+        frames, problem = open_clip(self.cache_dir, entry)
+        if frames is not None:
+            self.metadata[name] = {"fps": entry["fps"], "frame_count": entry["frame_count"]}
+        return frames, problem
+
+    def rebuild(self, name):
+        """Decode a registered clip again, replacing its cached copy. Returns the frames or None"""
+        return self._decode(name, self.sources[name])
+
+    def _load_frames(self, name, path):
+        """Load a clip from the cache directory if it is up to date, otherwise decode it"""
+        if self.cache_dir:
+            frames, problem = self.check(name)
+            if frames is not None:
+                return frames
+            if problem != "not cached":
+                print(f"Warning: cached '{name}' not used ({problem}), decoding it again")
+        return self._decode(name, path)
+
+    def _decode(self, name, path):
+        """Decode every frame of a clip at the target size into RAM or a memory-mapped file"""
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            print(f"Warning: Could not open {path}")
+            return None
+
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps <= 0:
+            fps = 30.0
+        expected = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        shape = (max(expected, 1), self.height, self.width, 3)
+        tmp_path = None
+        if self.cache_dir:
+            # Unique name: several processes (e.g. multi-station workers) may decode the same clip at once
+            fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self._cache_path(name)) + ".",
+                                            suffix=".tmp", dir=self.cache_dir)
+            os.close(fd)
+            frames = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8, shape=shape)
+        else:
+            frames = np.empty(shape, dtype=np.uint8)
+
+        count = 0
+        extra = []  # Frames beyond the container's reported frame count
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if frame.shape[1] != self.width or frame.shape[0] != self.height:
+                frame = cv2.resize(frame, (self.width, self.height))
+            if count < len(frames):
+                frames[count] = frame
+            else:
+                extra.append(frame)
+            count += 1
+        cap.release()
+
+        if count == 0:
+            print(f"Warning: {path} contains no frames")
+            del frames
+            if tmp_path:
+                os.remove(tmp_path)
+            return None
+
+        if extra:
+            frames = np.concatenate([frames, np.stack(extra)])
+        elif count < len(frames):
+            frames = frames[:count]
+
+        if tmp_path:
+            cache_path = self._cache_path(name)
+            if extra or count < shape[0]:
+                # Rewritten at the right length, also under a temporary name so no reader sees it half-written
+                with open(tmp_path + ".npy", "wb") as f:
+                    np.save(f, frames)
+                del frames
+                os.remove(tmp_path)
+                tmp_path += ".npy"
+            else:
+                frames.flush()
+                del frames
+            try:
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                # Another process published the same clip first (and has it mapped), theirs is just as good
+                os.remove(tmp_path)
+                if not os.path.exists(cache_path):
+                    raise
+            frames = np.load(cache_path, mmap_mode="r")
+
+        self.metadata[name] = {"fps": fps, "frame_count": len(frames)}
+        if self.cache_dir:
+            entry = {"file": os.path.basename(self._cache_path(name)), "source": path, "fps": fps,
+                     "frame_count": len(frames), "width": self.width, "height": self.height}
+            entry.update(source_fingerprint(path))
+            self.manifest = save_manifest_entry(self.cache_dir, clip_key(name, self.width, self.height), entry)
+        print(f"Decoded '{name}': {len(frames)} frames at {self.width}x{self.height}")
+        return frames
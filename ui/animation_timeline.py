@@ -0,0 +1,37 @@
+import numpy as np
+
+
+class AnimationTimeline:
+    """Precomputed elapsed-time -> frame index table for one animation.
+
+    The clip is stretched (or squeezed) to `duration` seconds. Lookups are a
+    single table index, so playing an animation at any speed never needs the
+    decoder to seek or the video's frame count and fps to be queried per frame.
+    """
+
+    def __init__(self, frame_count, duration, loop=False, resolution=1000):
+        self.frame_count = frame_count
+        self.duration = duration
+        self.loop = loop
+        self.resolution = resolution  # Table entries per second of playback
+
+        ticks = max(1, int(round(duration * resolution)))
+        # Same mapping as int(progress * frame_count), evaluated once per tick
+        self.frames = (np.arange(ticks, dtype=np.int64) * frame_count // ticks).astype(np.int32)
+
+    def frame_at(self, elapsed):
+        """Frame index to show `elapsed` seconds into playback, or None once a non-looping clip is done"""
+        tick = int(elapsed * self.resolution)
+        if tick < 0:
+            tick = 0
+        if tick >= len(self.frames):
+            if not self.loop:
+                return None
+            tick %= len(self.frames)
+        return int(self.frames[tick])
+
+    @classmethod
+    def for_difficulties(cls, frame_count, difficulty_levels):
+        """Build one stretched timeline per reaction time, keyed by the reaction time"""
+        return {reaction_time: cls(frame_count, reaction_time)
+                for reaction_time in difficulty_levels.values()}
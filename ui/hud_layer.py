@@ -0,0 +1,175 @@
+import cv2
+import numpy as np
+
+from ui.text_cache import put_text, get_text_size
+
+
+class HudSurface:
+    """Drawing target for a HUD widget.
+
+    Every primitive is drawn into both the HUD overlay and its coverage mask, offset so
+    that widgets can be redrawn into a sub-region of the layer. With no overlay
+    attached the surface only measures the area a widget would cover.
+
+    Widgets draw in layout coordinates; with a `scale` other than 1 every
+    position, font size and line width is scaled to the overlay's resolution.
+    """
+
+    def __init__(self, overlay=None, mask=None, x0=0, y0=0, scale=1.0):
+        self.overlay = overlay
+        self.mask = mask
+        self.x0 = x0
+        self.y0 = y0
+        self.scale = scale
+        self.bbox = None  # (x0, y0, x1, y1) covered by everything drawn so far
+
+    def _grow(self, x0, y0, x1, y1):
+        if self.bbox is None:
+            self.bbox = (x0, y0, x1, y1)
+        else:
+            bx0, by0, bx1, by1 = self.bbox
+            self.bbox = (min(bx0, x0), min(by0, y0), max(bx1, x1), max(by1, y1))
+
+    def _point(self, pt):
+        """Layout coordinates to overlay pixels (before the region offset)"""
+        if self.scale == 1.0:
+            return pt
+        return (round(pt[0] * self.scale), round(pt[1] * self.scale))
+
+    def _thickness(self, thickness):
+        if self.scale == 1.0 or thickness < 0:
+            return thickness
+        return max(1, round(thickness * self.scale))
+
+    def _shift(self, pt):
+        return (pt[0] - self.x0, pt[1] - self.y0)
+
+    def rectangle(self, pt1, pt2, color, thickness=1):
+        pt1, pt2, thickness = self._point(pt1), self._point(pt2), self._thickness(thickness)
+        pad = max(thickness, 0)
+        self._grow(min(pt1[0], pt2[0]) - pad, min(pt1[1], pt2[1]) - pad,
+                   max(pt1[0], pt2[0]) + pad + 1, max(pt1[1], pt2[1]) + pad + 1)
+        if self.overlay is not None:
+            cv2.rectangle(self.overlay, self._shift(pt1), self._shift(pt2), color, thickness)
+        if self.mask is not None:
+            cv2.rectangle(self.mask, self._shift(pt1), self._shift(pt2), 255, thickness)
+
+    def put_text(self, text, org, font, scale, color, thickness=1, line_type=cv2.LINE_8):
+        org, scale, thickness = self._point(org), scale * self.scale, self._thickness(thickness)
+        (w, h), baseline = get_text_size(text, font, scale, thickness)
+        self._grow(org[0] - thickness, org[1] - h - thickness,
+                   org[0] + w + thickness + 1, org[1] + baseline + thickness + 1)
+        if self.overlay is not None:
+            # Cached sprites, so labels that come back (round numbers, spell names) aren't rasterized again
+            put_text(self.overlay, text, self._shift(org), font, scale, color, thickness, line_type)
+        if self.mask is not None:
+            put_text(self.mask, text, self._shift(org), font, scale, 255, thickness, line_type)
+
+
+class HudLayer:
+    """Retained-mode HUD: widgets are rendered once into an overlay with a coverage mask.
+
+    A widget is only re-rendered when its inputs change. The overlay is drawn
+    over black, so it holds color * coverage, and the layer is blended onto a
+    frame with one multiply and one add per region, keeping anti-aliased edges.
+    `width` and `height` are the layer's pixel size; widgets lay out at
+    1/`scale` of it.
+    """
+
+    def __init__(self, width, height, scale=1.0):
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.overlay = np.zeros((height, width, 3), dtype=np.uint8)
+        self.mask = np.zeros((height, width), dtype=np.uint8)  # Coverage, 255 where fully opaque
+        self.keep = np.full((height, width, 3), 255, dtype=np.uint8)  # 255 - coverage, per channel
+        self.widgets = []  # Draw order, bottom to top
+        self.widgets_by_name = {}
+        self.bbox = None  # Union of all visible widget areas
+        self.regions = []  # Non-overlapping boxes covering every visible widget
+
+    def add_widget(self, name, render, *inputs):
+        """Add a widget drawn by render(surface, *inputs). Later widgets draw on top"""
+        widget = {"name": name, "render": render, "inputs": None, "bbox": None}
+        self.widgets.append(widget)
+        self.widgets_by_name[name] = widget
+        self.update(name, *inputs)
+
+    def update(self, name, *inputs):
+        """Set a widget's inputs, re-rendering it only if they changed"""
+        widget = self.widgets_by_name[name]
+        if widget["inputs"] == inputs:
+            return False
+
+        # Measure the new area so both the old and new areas get refreshed
+        surface = HudSurface(scale=self.scale)
+        widget["render"](surface, *inputs)
+        old_bbox = widget["bbox"]
+        widget["inputs"] = inputs
+        widget["bbox"] = self._clip(surface.bbox)
+
+        for bbox in (old_bbox, widget["bbox"]):
+            if bbox is not None:
+                self._redraw_region(bbox)
+        self._update_bbox()
+        return True
+
+    def _clip(self, bbox):
+        if bbox is None:
+            return None
+        x0, y0, x1, y1 = bbox
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width, x1), min(self.height, y1)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return (x0, y0, x1, y1)
+
+    def _redraw_region(self, bbox):
+        """Clear a region and redraw every widget touching it, in draw order"""
+        x0, y0, x1, y1 = bbox
+        overlay = self.overlay[y0:y1, x0:x1]
+        mask = self.mask[y0:y1, x0:x1]
+        overlay[:] = 0
+        mask[:] = 0
+        surface = HudSurface(overlay, mask, x0, y0, self.scale)
+        for widget in self.widgets:
+            wb = widget["bbox"]
+            if wb is None or wb[0] >= x1 or wb[2] <= x0 or wb[1] >= y1 or wb[3] <= y0:
+                continue
+            widget["render"](surface, *widget["inputs"])
+        # How much of the frame shows through, per channel to match the frame in composite()
+        cv2.merge([cv2.bitwise_not(mask)] * 3, dst=self.keep[y0:y1, x0:x1])
+
+    def _update_bbox(self):
+        boxes = [w["bbox"] for w in self.widgets if w["bbox"] is not None]
+        if not boxes:
+            self.bbox = None
+            self.regions = []
+            return
+        self.bbox = (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                     max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+        # Merge overlapping widget boxes, so no pixel is blended twice
+        regions = []
+        for box in boxes:
+            merged = True
+            while merged:
+                merged = False
+                for other in regions:
+                    if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+                        regions.remove(other)
+                        box = (min(box[0], other[0]), min(box[1], other[1]),
+                               max(box[2], other[2]), max(box[3], other[3]))
+                        merged = True
+                        break
+            regions.append(box)
+        self.regions = regions
+
+    def composite(self, display):
+        """Blend the HUD onto a frame, only over the widgets' regions"""
+        for x0, y0, x1, y1 in self.regions:
+            roi = display[y0:y1, x0:x1]
+            # Same blend as a text sprite: frame * (1 - coverage) + color * coverage
+            cv2.multiply(roi, self.keep[y0:y1, x0:x1], dst=roi, scale=1.0 / 255.0)
+            cv2.add(roi, self.overlay[y0:y1, x0:x1], dst=roi)
+        return display
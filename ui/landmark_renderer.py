@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+
+from core.gestureUtils import landmarks_to_array
+
+# Landmark pairs joined by lines, same hand skeleton as MediaPipe's HAND_CONNECTIONS
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+CONNECTION_COLOR = (224, 224, 224)  # MediaPipe's default drawing colors
+LANDMARK_COLOR = (0, 0, 255)
+CONNECTION_THICKNESS = 2
+LANDMARK_RADIUS = 3
+
+_CONNECTION_INDEX = np.array(HAND_CONNECTIONS, dtype=np.intp)
+
+
+def draw_hand_landmarks(image, landmarks, rect=None):
+    """Draw hand skeletons from an (N, 21, 3) array of normalized landmarks
+    (or MediaPipe hand landmark lists).
+
+    `rect` is an optional (x, y, width, height) area of `image` the landmarks
+    map to (e.g. the camera inset), otherwise they span the whole image.
+    All hands are converted to pixels in one NumPy operation and drawn with
+    two OpenCV calls: every connection, then every landmark as a dot.
+    """
+    if landmarks is None or len(landmarks) == 0:
+        return image
+    if not isinstance(landmarks, np.ndarray):
+        landmarks = landmarks_to_array(landmarks)
+    if rect is None:
+        rect = (0, 0, image.shape[1], image.shape[0])
+    x, y, w, h = rect
+    points = (landmarks[..., :2] * np.array((w, h), dtype=np.float32) + (x, y)).astype(np.int32)
+
+    # (hands * connections, 2, 2) line segments
+    cv2.polylines(image, list(points[:, _CONNECTION_INDEX].reshape(-1, 2, 2)), False,
+                  CONNECTION_COLOR, CONNECTION_THICKNESS)
+    # A zero-length segment this thick rasterizes exactly like a filled circle of LANDMARK_RADIUS
+    dots = np.repeat(points.reshape(-1, 1, 2), 2, axis=1)
+    cv2.polylines(image, list(dots), False, LANDMARK_COLOR, 2 * LANDMARK_RADIUS)
+    return image
@@ -0,0 +1,39 @@
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+
+@lru_cache(maxsize=16)
+def _solid_patch(height, width, color):
+    """Solid-color block used as the overlay side of a blend. Shared, must not be drawn on"""
+    patch = np.empty((height, width, 3), dtype=np.uint8)
+    patch[:] = color
+    return patch
+
+
+def blend_rect(image, pt1, pt2, color, alpha):
+    """Blend a filled rectangle of `color` into `image` in place with opacity `alpha`.
+
+    Gives the same pixels as drawing the rectangle on a copy of the image and
+    cv2.addWeighted(copy, alpha, image, 1 - alpha, 0, image), but only the
+    rectangle is read and written. Corners are inclusive, like cv2.rectangle.
+    """
+    h, w = image.shape[:2]
+    x0, y0 = max(0, min(pt1[0], pt2[0])), max(0, min(pt1[1], pt2[1]))
+    x1, y1 = min(w, max(pt1[0], pt2[0]) + 1), min(h, max(pt1[1], pt2[1]) + 1)
+    if x0 >= x1 or y0 >= y1:
+        return image
+
+    roi = image[y0:y1, x0:x1]
+    if not any(color):
+        # Blending with black is just a scale, no overlay needed
+        cv2.convertScaleAbs(roi, dst=roi, alpha=1.0 - alpha)
+    else:
+        cv2.addWeighted(_solid_patch(y1 - y0, x1 - x0, tuple(color)), alpha, roi, 1.0 - alpha, 0, dst=roi)
+    return image
+
+
+def dimmed_copy(src, dst, alpha):
+    """Write `src` darkened by a black overlay of opacity `alpha` into `dst` in one pass"""
+    return cv2.convertScaleAbs(src, dst=dst, alpha=1.0 - alpha)
@@ -0,0 +1,145 @@
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class TextSprite:
+    """One string rasterized once: colored pixels plus coverage, ready to blit.
+
+    The sprite matches the image it is blitted onto: pass a BGR tuple color for
+    3-channel images and a single number for masks.
+
+    `offset` is where the sprite's top-left corner sits relative to the text
+    origin passed to cv2.putText, so blitting at an origin lands exactly where
+    putText would have drawn.
+    """
+
+    def __init__(self, text, font, scale, color, thickness, line_type):
+        (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+        pad = thickness + 2  # Stroke width and anti-aliasing spill past the text box
+        shape = (h + baseline + 2 * pad, w + 2 * pad)
+        if isinstance(color, (tuple, list)):
+            shape += (len(color),)
+        org = (pad, pad + h)
+
+        # Rasterize over black and over white. Over black gives color * coverage,
+        # and the difference gives how much of the background shows through, so
+        # blitting reproduces whatever blending putText itself does.
+        on_black = np.zeros(shape, dtype=np.uint8)
+        on_white = np.full(shape, 255, dtype=np.uint8)
+        cv2.putText(on_black, text, org, font, scale, color, thickness, line_type)
+        cv2.putText(on_white, text, org, font, scale, color, thickness, line_type)
+        keep = (on_white.astype(np.int16) - on_black).clip(0, 255).astype(np.uint8)
+
+        # Trim to the pixels actually touched
+        touched = keep < 255 if keep.ndim == 2 else (keep < 255).any(axis=2)
+        ys, xs = np.nonzero(touched)
+        if len(ys):
+            y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+        else:
+            y0 = y1 = x0 = x1 = 0
+        self.offset = (x0 - pad, y0 - pad - h)
+        self.premult = np.ascontiguousarray(on_black[y0:y1, x0:x1])
+        self.keep = np.ascontiguousarray(keep[y0:y1, x0:x1])
+
+        # Without anti-aliasing coverage is all-or-nothing, so a masked copy does
+        self.binary = bool(np.all((self.keep == 0) | (self.keep == 255)))
+        if self.binary:
+            self.mask = np.ascontiguousarray(touched[y0:y1, x0:x1]).astype(np.uint8)
+
+    @property
+    def nbytes(self):
+        return self.premult.nbytes + self.keep.nbytes + (self.mask.nbytes if self.binary else 0)
+
+    def blit(self, image, org):
+        """Draw the sprite onto `image` (3-channel or single-channel) with its text origin at `org`"""
+        x0, y0 = org[0] + self.offset[0], org[1] + self.offset[1]
+        h, w = self.keep.shape[:2]
+        img_h, img_w = image.shape[:2]
+        # Clip to the image
+        sx0, sy0 = max(0, -x0), max(0, -y0)
+        sx1, sy1 = min(w, img_w - x0), min(h, img_h - y0)
+        if sx0 >= sx1 or sy0 >= sy1:
+            return image
+        roi = image[y0 + sy0:y0 + sy1, x0 + sx0:x0 + sx1]
+        region = (slice(sy0, sy1), slice(sx0, sx1))
+
+        if self.binary:
+            cv2.copyTo(self.premult[region], self.mask[region], roi)
+        else:
+            cv2.multiply(roi, self.keep[region], dst=roi, scale=1.0 / 255.0)
+            cv2.add(roi, self.premult[region], dst=roi)
+        return image
+
+
+class TextCache:
+    """LRU cache of rasterized text sprites and text layout metrics.
+
+    Labels that are drawn every frame (menus, end screens, HUD widgets) are
+    rasterized once per (string, font, scale, color, thickness, line type) and
+    blitted afterwards. Only the `max_entries` most recently used sprites are
+    kept, so strings that keep changing (timers, counters) can't grow it
+    without bound. Safe to use from several threads: the game's HUD is rendered
+    on a loader thread while the title screen draws.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.sprites = OrderedDict()  # key -> TextSprite, in LRU order
+        self.sizes = OrderedDict()  # (text, font, scale, thickness) -> getTextSize result
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # Guards both LRU tables and the counters
+
+    def get_text_size(self, text, font, scale, thickness):
+        """Same as cv2.getTextSize, cached"""
+        key = (text, font, scale, thickness)
+        with self.lock:
+            size = self.sizes.get(key)
+            if size is None:
+                size = cv2.getTextSize(text, font, scale, thickness)
+                self.sizes[key] = size
+                if len(self.sizes) > self.max_entries:
+                    self.sizes.popitem(last=False)
+            else:
+                self.sizes.move_to_end(key)
+            return size
+
+    def sprite(self, text, font, scale, color, thickness=1, line_type=cv2.LINE_8):
+        key = (text, font, scale, tuple(color) if isinstance(color, (tuple, list)) else color,
+               thickness, line_type)
+        with self.lock:
+            sprite = self.sprites.get(key)
+            if sprite is None:
+                self.misses += 1
+                sprite = TextSprite(text, font, scale, color, thickness, line_type)
+                self.sprites[key] = sprite
+                if len(self.sprites) > self.max_entries:
+                    self.sprites.popitem(last=False)
+            else:
+                self.hits += 1
+                self.sprites.move_to_end(key)
+            return sprite
+
+    def put_text(self, image, text, org, font, scale, color, thickness=1, line_type=cv2.LINE_8):
+        """Drop-in for cv2.putText that blits a cached sprite"""
+        return self.sprite(text, font, scale, color, thickness, line_type).blit(image, org)
+
+    def clear(self):
+        with self.lock:
+            self.sprites.clear()
+            self.sizes.clear()
+
+
+# Shared by every screen, so menu and HUD labels are rasterized once per run
+text_cache = TextCache()
+
+def put_text(image, text, org, font, scale, color, thickness=1, line_type=cv2.LINE_8):
+    """cv2.putText through the shared text cache"""
+    return text_cache.put_text(image, text, tuple(org), font, scale, color, thickness, line_type)
+
+def get_text_size(text, font, scale, thickness):
+    """cv2.getTextSize through the shared text cache"""
+    return text_cache.get_text_size(text, font, scale, thickness)
@@ -1,11 +1,24 @@
 import cv2
 import numpy as np
 import time
+import sys
+import os
+
+# Add the parent directory to the path so we can import from core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.frame_scheduler import FrameScheduler
+from ui.animation_cache import AnimationCache, ASSETS_DIR, CACHE_DIR
+from ui.overlay import blend_rect
+from ui.text_cache import put_text, get_text_size
 
 class TitleScreen:
-    def __init__(self):
-        self.idle_video_path = "assets/mageIdle.mkv"
-        self.cap = None
+    def __init__(self, target_fps=33.0, status=None, assets=None):
+        self.idle_video_path = os.path.join(ASSETS_DIR, "mageIdle.mkv")
+        # Shared AnimationCache (e.g. the game's), so the idle clip is decoded only once
+        self.assets = assets
+        self.owns_assets = assets is None
+        self.animation_index = 0
         self.frame_width = 800
         self.frame_height = 600
         self.title = "WIZARD FIGHT"
@@ -17,31 +30,28 @@ class TitleScreen:
         self.selected_difficulty = 0
         self.animation_frame = None
         self.frame_count = 0
+        self.scheduler = FrameScheduler(target_fps=target_fps)  # Replaces a fixed waitKey(30)
+        self.status = status  # Optional callable returning a loading status line (or None)
+        self.first_frame_time = None  # perf_counter() when the menu was first shown
         
     def load_idle_animation(self):
         """Load the idle animation video"""
-        self.cap = cv2.VideoCapture(self.idle_video_path)
-        if not self.cap.isOpened():
+        if self.assets is None:
+            self.assets = AnimationCache(self.frame_width, self.frame_height, cache_dir=CACHE_DIR)
+        if "idle" not in self.assets.sources:
+            self.assets.register("idle", self.idle_video_path)
+        if not self.assets.load("idle"):
             print(f"Error: Could not open {self.idle_video_path}")
             return False
         return True
     
     def get_next_animation_frame(self):
-        """Get the next frame from the idle animation"""
-        if self.cap is None:
+        """Get the next frame from the idle animation (looping), sized to fit our display"""
+        if self.assets is None:
             return None
-            
-        ret, frame = self.cap.read()
-        if not ret:
-            # Loop the animation
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, frame = self.cap.read()
-            
-        if ret:
-            # Resize frame to fit our display
-            frame = cv2.resize(frame, (self.frame_width, self.frame_height))
-            return frame
-        return None
+        frame = self.assets.get_frame("idle", self.animation_index, (self.frame_width, self.frame_height))
+        self.animation_index += 1
+        return frame
     
     def draw_title(self, image):
         """Draw the main title with a magical effect"""
@@ -49,13 +59,11 @@ class TitleScreen:
         title_height = 120
         title_y = 50  # Keep banner position the same
         
-        # Draw semi-transparent overlay for title area
-        overlay = image.copy()
-        cv2.rectangle(overlay, (0, title_y - 20), (self.frame_width, title_y + title_height), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.7, image, 0.3, 0, image)
+        # Draw semi-transparent overlay for title area (blended in place, only inside the banner)
+        blend_rect(image, (0, title_y - 20), (self.frame_width, title_y + title_height), (0, 0, 0), 0.7)
         
         # Draw title with shadow effect
-        title_size = cv2.getTextSize(self.title, cv2.FONT_HERSHEY_DUPLEX, 2.5, 4)[0]
+        title_size = get_text_size(self.title, cv2.FONT_HERSHEY_DUPLEX, 2.5, 4)[0]
         
         # Calculate box dimensions to perfectly center the title
         box_width = title_size[0] + 40  # 20 pixels padding on each side
@@ -71,10 +79,10 @@ class TitleScreen:
         cv2.rectangle(image, (box_x, box_y), (box_x + box_width, box_y + box_height), (255, 215, 0), 2)
         
         # Shadow
-        cv2.putText(image, self.title, (text_x + 3, text_y), 
+        put_text(image, self.title, (text_x + 3, text_y), 
                    cv2.FONT_HERSHEY_DUPLEX, 2.5, (50, 50, 50), 4, cv2.LINE_AA)
         # Main text
-        cv2.putText(image, self.title, (text_x, text_y), 
+        put_text(image, self.title, (text_x, text_y), 
                    cv2.FONT_HERSHEY_DUPLEX, 2.5, (255, 215, 0), 4, cv2.LINE_AA)
         
         # Add magical sparkle effect
@@ -96,16 +104,14 @@ class TitleScreen:
         option_spacing = 15  # Increased slightly to prevent overlap
         
         # Draw semi-transparent background for options
-        overlay = image.copy()
-        cv2.rectangle(overlay, (50, options_start_y - 20), 
-                     (self.frame_width - 50, options_start_y + len(self.difficulties) * (option_height + option_spacing) + 20), 
-                     (30, 30, 60), -1)
-        cv2.addWeighted(overlay, 0.7, image, 0.3, 0, image)
+        blend_rect(image, (50, options_start_y - 20), 
+                   (self.frame_width - 50, options_start_y + len(self.difficulties) * (option_height + option_spacing) + 20), 
+                   (30, 30, 60), 0.7)
         
         for i, difficulty in enumerate(self.difficulties):
             y_pos = options_start_y + i * (option_height + option_spacing)
             text = f"{difficulty['name']}"
-            text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1.5, 3)[0]
+            text_size = get_text_size(text, cv2.FONT_HERSHEY_SIMPLEX, 1.5, 3)[0]
             
             # Calculate box dimensions to perfectly center the text
             box_width = text_size[0] + 30  # 15 pixels padding on each side
@@ -126,9 +132,9 @@ class TitleScreen:
                 cv2.rectangle(image, (box_x, box_y), (box_x+box_width, box_y+box_height), (255,255,255), 2)
             
             # Shadow
-            cv2.putText(image, text, (text_x+2, text_y), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (40,40,40), 3, cv2.LINE_AA)
+            put_text(image, text, (text_x+2, text_y), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (40,40,40), 3, cv2.LINE_AA)
             # Main text
-            cv2.putText(image, text, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 1.5, difficulty['color'], 3, cv2.LINE_AA)
+            put_text(image, text, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 1.5, difficulty['color'], 3, cv2.LINE_AA)
     
     def draw_instructions(self, image):
         """Draw smaller instructions at the bottom with proper centering and outline"""
@@ -146,7 +152,7 @@ class TitleScreen:
         # Calculate the widest instruction for centering
         max_width = 0
         for instruction in instructions:
-            text_size = cv2.getTextSize(instruction, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
+            text_size = get_text_size(instruction, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
             max_width = max(max_width, text_size[0])
         
         # Calculate box dimensions
@@ -156,21 +162,26 @@ class TitleScreen:
         box_y = y_start - 10
         
         # Semi-transparent background
-        overlay = image.copy()
-        cv2.rectangle(overlay, (box_x, box_y), (box_x + box_width, box_y + box_height), (30,30,60), -1)
-        cv2.addWeighted(overlay, 0.7, image, 0.3, 0, image)
+        blend_rect(image, (box_x, box_y), (box_x + box_width, box_y + box_height), (30,30,60), 0.7)
         
         # Draw outline around instructions
         cv2.rectangle(image, (box_x, box_y), (box_x + box_width, box_y + box_height), (220, 220, 255), 1)
         
         for i, instruction in enumerate(instructions):
-            text_size = cv2.getTextSize(instruction, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
+            text_size = get_text_size(instruction, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
             
             # Calculate text position to be perfectly centered within the box
             text_x = box_x + (box_width - text_size[0]) // 2
             text_y = box_y + 15 + i * instruction_height  # Start 15 pixels from top of box
             
-            cv2.putText(image, instruction, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (220, 220, 255), 1, cv2.LINE_AA)
+            put_text(image, instruction, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (220, 220, 255), 1, cv2.LINE_AA)
+
+    def draw_status(self, image):
+        """Draw the loading status line in the bottom left corner, if there is one"""
+        text = self.status() if self.status else None
+        if text:
+            put_text(image, text, (10, self.frame_height - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.45,
+                       (180, 180, 200), 1, cv2.LINE_AA)
 
     def handle_input(self, key):
         """Handle keyboard input for menu navigation (W/S/Enter only)"""
@@ -186,8 +197,9 @@ class TitleScreen:
     
     def cleanup(self, destroy_all=True):
         """Clean up resources"""
-        if self.cap:
-            self.cap.release()
+        # A shared cache stays loaded for the game
+        if self.owns_assets and self.assets is not None:
+            self.assets.release()
         if destroy_all:
             cv2.destroyAllWindows()
         else:
@@ -212,8 +224,10 @@ class TitleScreen:
         print("Select your difficulty and press ENTER to begin...")
         
         while True:
-            # Get animation frame
-            animation_frame = self.get_next_animation_frame()
+            # Get animation frame, keeping the previous one when running behind
+            if self.animation_frame is None or self.scheduler.should_refresh():
+                self.animation_frame = self.get_next_animation_frame()
+            animation_frame = self.animation_frame
             if animation_frame is None:
                 # Fallback: create a dark background
                 image = np.zeros((self.frame_height, self.frame_width, 3), dtype=np.uint8)
@@ -225,12 +239,15 @@ class TitleScreen:
             self.draw_title(image)
             self.draw_difficulty_options(image)
             self.draw_instructions(image)
+            self.draw_status(image)
             
             # Display the frame
             cv2.imshow(window_name, image)
+            if self.first_frame_time is None:
+                self.first_frame_time = time.perf_counter()
             
-            # Handle input
-            key = cv2.waitKey(30) & 0xFF
+            # Handle input (polled every frame, waiting only for the rest of the frame budget)
+            key = self.scheduler.wait_key()
             result = self.handle_input(key)
             
             if result:
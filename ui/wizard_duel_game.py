@@ -1,279 +1,321 @@
+import argparse
+import random
 import time
 import cv2
-import mediapipe as mp
 import sys
 import os
 
 # Add the parent directory to the path so we can import from core and ui
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.gestureUtils import get_fingers_up, get_spells_from_fingers
-from core.gameLogic import (
-    evaluate_spell,
-    is_game_over,
-    get_random_spell,
-    get_reaction_time,
-)
+from core.camera_capture import CameraCapture
+from core.frame_pipeline import FramePipeline, result_detector
+from core.frame_profiler import FrameProfiler
+from core.frame_scheduler import FrameScheduler
+from core.duel_session import DuelSession, HandSpellDetector, READY, ATTACK, GAME_OVER
+from core.gameLogic import get_random_spell
+from core.gesture_commit import GestureCommitter
+from core.hand_roi import HandRoiTracker
+from core.render_latency import RenderLatencyCompensator
+from core.landmark_recording import LandmarkRecorder
+from core.performance_profiles import get_profile, create_hands
+from core.quality_governor import QualityGovernor
+from core.startup import StartupLoader, warm_up_hands
 from ui.title_screen import TitleScreen
 from ui.game_display import GameDisplay
+from ui.animation_cache import AnimationCache, CACHE_DIR
 
-# Health Bar Configuration (adapted from main.py)
-MAX_HP = 100
-BAR_WIDTH = 200
-BAR_HEIGHT = 25
-HP_BAR_COLOR_PLAYER = (0, 255, 0)  # Green
-HP_BAR_COLOR_MAGE = (0, 0, 255)    # Red
-HP_BAR_BACKGROUND_COLOR = (100, 100, 100) # Dark Gray
-TEXT_COLOR = (255, 255, 255) # White
+def parse_args():
+    parser = argparse.ArgumentParser(description="Wizard Fight - Hand Gesture Magic Duel Game")
+    parser.add_argument("--target-fps", type=float, default=120.0,
+                        help="Frame rate the game loop is paced to (default: 120)")
+    parser.add_argument("--perf-profile", metavar="NAME",
+                        help="Hand tracking performance profile: low, balanced or quality (default: quality)")
+    parser.add_argument("--perf-config", metavar="PATH",
+                        help="JSON file with additional or overridden performance profiles")
+    parser.add_argument("--roi", action="store_true",
+                        help="Run hand tracking on a crop around the last seen hand instead of the full frame")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Run camera capture and hand tracking in their own processes, sharing frames through shared memory")
+    parser.add_argument("--commit-frames", type=int, default=4,
+                        help="Consecutive frames a gesture must be held to lock in a spell (default: 4)")
+    parser.add_argument("--commit-confidence", type=float, default=0.75,
+                        help="Confidence-weighted share of recent votes that also locks in a spell (default: 0.75)")
+    parser.add_argument("--no-early-resolve", action="store_true",
+                        help="Always wait out the full reaction time, even after a spell is locked in")
+    parser.add_argument("--timings", action="store_true",
+                        help="Record per-stage frame timings and print p50/p95/p99 at exit")
+    parser.add_argument("--timings-overlay", action="store_true",
+                        help="Show per-stage frame timings on screen (implies --timings)")
+    parser.add_argument("--timings-out", metavar="PATH",
+                        help="Write per-frame timings to a .csv or .json file at exit (implies --timings)")
+    parser.add_argument("--latency-compensation", action="store_true",
+                        help="Widen reaction windows by the measured render latency (tick to imshow), so difficulty feels the same on any hardware")
+    parser.add_argument("--adaptive-quality", type=float, nargs="?", const=60.0, metavar="FPS",
+                        help="Lower the render resolution, then the animation rate, then the hand tracking rate "
+                             "while frames take longer than 1/FPS, and raise them again with headroom (default FPS: 60)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="Record hand landmarks and mage spells to a file for replay with core/landmark_recording.py")
+    parser.add_argument("--seed", type=int,
+                        help="Seed for the mage's spell choices (default: random, stored in the recording)")
+    # Ignore unknown arguments so the launcher can pass its own command line through
+    return parser.parse_known_args()[0]
 
-difficulty = None # Will be set by player
-player_hp = 100
-mage_hp = 100
-round_num = 1
+def open_camera():
+    """Open and start the camera, or None if it can't be opened"""
+    # Frames are captured on a background thread so the game loop never blocks on the camera
+    cap = CameraCapture(0)
+    if not cap.isOpened():
+        return None
+    return cap.start()
 
-# Initialize camera first, before title screen
-print("Initializing camera...")
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("Error: Could not open camera!")
-    exit()
+def load_hand_tracking(perf_profile, use_roi):
+    """Build the hand model and run a warm-up inference. Returns the hand tracker, which owns the model"""
+    hands = create_hands(perf_profile)
+    width = perf_profile.get("inference_width") or 640
+    warm_up_hands(hands, width, width * 3 // 4)
+    # Optionally shrink the inference input to a region around the last seen hand
+    return HandRoiTracker.for_profile(hands, perf_profile) if use_roi else hands
 
-# Get camera dimensions
-frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+def main():
+    """Run the game: title screen, then duels until the player quits"""
+    args = parse_args()
 
-# Initialize game display
-game_display = GameDisplay(frame_width=1920, frame_height=1080)
+    # Per-stage frame timing (capture, convert, inference, gesture, compose, display)
+    profiler = FrameProfiler(enabled=args.timings or args.timings_overlay or bool(args.timings_out),
+                             keep_records=bool(args.timings_out))
 
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands()
-mp_draw = mp.solutions.drawing_utils
+    # Waits only for what is left of each frame's budget instead of a fixed waitKey(8)
+    scheduler = FrameScheduler(target_fps=args.target_fps)
 
-def draw_health_bar(image, current_hp, max_hp, x, y, label, bar_color):
-    # Draw background
-    cv2.rectangle(image, (x, y), (x + BAR_WIDTH, y + BAR_HEIGHT), HP_BAR_BACKGROUND_COLOR, -1)
-    # Draw current health
-    current_bar_width = int(BAR_WIDTH * (max(0, current_hp) / max_hp)) # Ensure current_hp isn't negative for drawing
-    cv2.rectangle(image, (x, y), (x + current_bar_width, y + BAR_HEIGHT), bar_color, -1)
-    # Draw border
-    cv2.rectangle(image, (x, y), (x + BAR_WIDTH, y + BAR_HEIGHT), (50,50,50), 2)
-    # Draw text
-    cv2.putText(image, f"{label}: {max(0,current_hp)}/{max_hp}", (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, TEXT_COLOR, 2)
+    latency = None  # RenderLatencyCompensator with --latency-compensation, set up once the game starts
 
-# Show the new title screen with idle animation
-print("Starting Wizard Fight...")
-title_screen = TitleScreen()
-difficulty = title_screen.show()
+    def show_frame(frame, ticked_at=None):
+        """Show a game frame (with the timing overlay if enabled) and poll the keyboard.
 
-if difficulty == "quit":
-    cap.release()
-    game_display.cleanup()
-    cv2.destroyAllWindows()
-    exit()
+        `ticked_at` is when the session finished the tick this frame shows; the
+        time until the frame is handed to the window is a render latency sample.
+        """
+        if args.timings_overlay:
+            profiler.draw_overlay(frame)
+            profiler.mark("overlay")
+        cv2.imshow("Wizard Duel", frame)
+        profiler.mark("display")
+        if latency is not None and ticked_at is not None:
+            # Sampled before the pacing wait, which is deliberate and not latency
+            latency.add(ticked_at, time.perf_counter())
+        # The rest of the frame's budget, spent polling the keyboard
+        key = scheduler.wait_key()
+        profiler.mark("wait")
+        return key
 
-reaction_time = get_reaction_time(difficulty)
-print(f"Difficulty set to: {difficulty.upper()}. Reaction time: {reaction_time}s")
-print("Press any key on the OpenCV window to start the duel...")
+    # Hand tracking settings come from the selected performance profile
+    profile_name, perf_profile = get_profile(args.perf_profile, args.perf_config)
+    print(f"Performance profile: {profile_name} {perf_profile}")
 
-# Wait for a key press to start the game, showing a blank or camera feed
-while True:
-    success, img = cap.read()
-    if not success:
-        print("Failed to grab frame. Exiting.")
-        cap.release()
-        game_display.cleanup()
-        cv2.destroyAllWindows()
-        exit()
-    
-    # Create a simple ready screen
-    ready_display = game_display.create_game_display(
-        camera_frame=img,
-        player_hp=player_hp,
-        mage_hp=mage_hp,
-        round_num=round_num
-    )
-    cv2.putText(ready_display, "Press any key to START", (50, frame_height // 2), 
-               cv2.FONT_HERSHEY_SIMPLEX, 1, (255,255,255), 2, cv2.LINE_AA)
-    
-    cv2.imshow("Wizard Duel", ready_display)
-    
-    # Use consistent frame timing (120 FPS for 120 FPS lock)
-    key = cv2.waitKey(8) & 0xFF  # ~120 FPS
-    if key != -1: # Wait for any key press
-        break
+    # Camera, animations and the (warmed-up) hand model load in parallel while the title screen shows
+    print("Initializing camera, animations and hand tracking...")
+    startup = StartupLoader()
+    # One animation cache for the title screen and the game, each clip is decoded once
+    assets = AnimationCache(1920, 1080, cache_dir=CACHE_DIR)
+    startup.submit("animations", GameDisplay, frame_width=1920, frame_height=1080, assets=assets)
+    if args.pipeline:
+        # Capture and inference processes, started (and the model warmed up) during the title screen
+        startup.submit("pipeline", FramePipeline(0, args.perf_profile, args.perf_config, args.roi).start)
+    else:
+        startup.submit("camera", open_camera)
+        startup.submit("hand model", load_hand_tracking, perf_profile, args.roi)
 
-print("\nWizard Duel Begins!")
+    recorder = None
 
-while player_hp > 0 and mage_hp > 0:
-    print(f"\nROUND {round_num}")
-    print(f"Mage HP: {mage_hp} | YOUR HP: {player_hp}")
-    
-    mage_spell = get_random_spell()
-    print(f"The mage casts: {mage_spell.upper()}! Counter it!")
-    
-    # Start mage attack animation
-    game_display.start_attack_animation(reaction_time)
-    attack_start_time = time.time()
+    def loading_status():
+        pending = startup.pending()
+        return f"Loading: {', '.join(pending)}..." if pending else None
 
-    player_spell = None
-    reaction_start_time = time.time()
+    try:
+        # Show the new title screen with idle animation
+        print("Starting Wizard Fight...")
+        title_screen = TitleScreen(status=loading_status, assets=assets)
+        difficulty = title_screen.show()
+        if title_screen.first_frame_time is not None:
+            print(f"Title screen interactive after {startup.mark('title screen', title_screen.first_frame_time):.2f}s")
+        if difficulty == "quit":
+            return 0
 
-    # Play the attack animation synchronized with reaction time
-    while time.time() - reaction_start_time < reaction_time:
-        success, img = cap.read()
-        if not success:
-            print("Failed to grab frame from camera.")
-            player_hp = 0
-            break
+        if startup.pending():
+            print(f"Waiting for {', '.join(startup.pending())} to finish loading...")
+        pipeline = cap = None
+        if args.pipeline:
+            pipeline = startup.get("pipeline")
+            if pipeline is None:
+                print("Error: Could not open camera!")
+                return 1
+        else:
+            cap = startup.get("camera")
+            if cap is None:
+                print("Error: Could not open camera!")
+                return 1
+        game_display = startup.get("animations")
+        if not args.pipeline:
+            hand_tracker = startup.get("hand model")
+        print(f"Game ready after {startup.mark('game ready'):.2f}s")
+        startup.report()
 
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        results = hands.process(img_rgb)
+        if pipeline is not None:
+            # Inference runs in its own process, the session gets its results
+            detector = result_detector
+        else:
+            # Downscales to the profile's inference resolution before converting
+            detector = HandSpellDetector(hand_tracker, perf_profile, profiler=profiler)
 
-        # Gather all hand landmarks for display
-        hand_landmarks = results.multi_hand_landmarks if results.multi_hand_landmarks else None
+        # Locks in a spell once a hand holds it steadily, filtering out single-frame misdetections
+        committer = GestureCommitter(frames_to_commit=args.commit_frames,
+                                     confidence_threshold=args.commit_confidence)
 
-        # Always use the latest detected spell (not just the first)
-        if hand_landmarks:
-            for handLms in hand_landmarks:
-                mp_draw.draw_landmarks(img, handLms, mp_hands.HAND_CONNECTIONS)
-                fingers_up = get_fingers_up(handLms)
-                detected_spell_this_frame = get_spells_from_fingers(fingers_up)
-                if detected_spell_this_frame:
-                    player_spell = detected_spell_this_frame
+        # Seeded so a recording also captures the mage's spell sequence
+        seed = args.seed if args.seed is not None else random.randrange(2**31)
+        spell_rng = random.Random(seed)  # Own generator, nothing else can shift the sequence
+        if args.record:
+            recorder = LandmarkRecorder(args.record, seed=seed, difficulty=difficulty,
+                                        commit_frames=args.commit_frames, commit_confidence=args.commit_confidence,
+                                        commit_window=committer.window, commit_min_votes=committer.min_votes,
+                                        early_resolve=not args.no_early_resolve)
+            print(f"Recording hand landmarks to {args.record} (seed {seed})")
 
-        # Calculate remaining time for player reaction
-        remaining_time = reaction_time - (time.time() - reaction_start_time)
+        # Gestures are judged by capture time; this also gives back the time frames take to reach the screen
+        latency = RenderLatencyCompensator() if args.latency_compensation else None
 
-        # Create the game display with all elements (including spell announcement)
-        game_frame = game_display.create_game_display(
-            camera_frame=img,
-            mage_spell=mage_spell,  # This should show the spell announcement
-            player_spell=player_spell,
-            countdown=remaining_time,
-            player_hp=player_hp,
-            mage_hp=mage_hp,
-            round_num=round_num,
-            hand_landmarks=hand_landmarks,
-            mp_draw=mp_draw,
-            mp_hands=mp_hands
-        )
+        session = DuelSession(difficulty, detector=detector, committer=committer, display=game_display,
+                              spell_picker=lambda: get_random_spell(spell_rng),
+                              early_resolve=not args.no_early_resolve, recorder=recorder, latency=latency)
+        print(f"Difficulty set to: {difficulty.upper()}. Reaction time: {session.reaction_time}s")
+        print("Press any key on the OpenCV window to start the duel...")
 
-        # Show the complete game display with consistent timing
-        cv2.imshow("Wizard Duel", game_frame)
-        
-        # Use consistent frame timing (120 FPS for 120 FPS lock)
-        key = cv2.waitKey(8) & 0xFF  # ~120 FPS
-        if key == ord('q'):
-            player_hp = 0
-            break
+        # Steps quality down (and back up) from measured frame times
+        governor = None
+        inference_interval = 0.0
+        last_inference = 0.0
+        if args.adaptive_quality:
+            governor = QualityGovernor(target_fps=args.adaptive_quality)
+            # Frames composed at a lower render scale are scaled back up by the window
+            cv2.namedWindow("Wizard Duel", cv2.WINDOW_NORMAL)
+            cv2.resizeWindow("Wizard Duel", game_display.frame_width, game_display.frame_height)
 
-    # Attack phase is over - animation system handles transition to idle automatically
+        duel_start_time = None
+        duel_start_frame = 0
+        while True:
+            phase = session.phase
+            profiler.begin_frame(phase)
 
-    # Now check if player cast a spell within the reaction time
-    if player_spell:
-        print(f"You cast: {player_spell.upper()}")
-    else:
-        print("You failed to cast a spell in time!")
+            # The end screens don't show the camera
+            img = captured_at = results = None
+            if phase != GAME_OVER:
+                if pipeline is not None:
+                    if pipeline.failed():
+                        print("Failed to grab frame from camera.")
+                        break
+                    # Newest camera frame, read in place from shared memory
+                    latest = pipeline.latest_frame()
+                    img = latest[2] if latest is not None else None
+                    results = pipeline.results()
+                else:
+                    success, img, captured_at = cap.read_latest()
+                    if not success:
+                        print("Failed to grab frame from camera.")
+                        break
+                profiler.mark("capture")
 
-    # Evaluate the round
-    player_hp, mage_hp, round_result_message = evaluate_spell(player_spell, mage_spell, player_hp, mage_hp)
-    print(round_result_message)
+            # Same clock as the capture timestamps, including those from the pipeline's processes
+            now = time.monotonic()
+            if results is None:
+                if img is not None and now - last_inference < inference_interval:
+                    session.tick(None, now)  # Hand tracking throttled by the quality governor
+                else:
+                    session.tick(img, now, captured_at)
+                    last_inference = now
+            else:
+                # Each inference result is one input sample; without one the clock still advances
+                for result in results or [None]:
+                    session.tick(result, now, result.captured_at if result is not None else None)
+            # Hand tracking is already made up for by judging frames by capture time
+            ticked_at = time.perf_counter()
+            if phase == ATTACK:
+                profiler.mark("gesture")
 
-    # Check for win/loss
-    game_over_status = is_game_over(player_hp, mage_hp)
-    if game_over_status == "player":
-        print("\nYou have been defeated!")
-        
-        # Set the victory animation (mage wins) before showing screen
-        game_display.start_victory_animation()
-        
-        # Show defeat screen
-        print("Showing defeat screen...")
-        while True:
-            defeat_display = game_display.create_win_defeat_screen("player", player_hp, mage_hp, round_num)
-            cv2.imshow("Wizard Duel", defeat_display)
-            
-            key = cv2.waitKey(8) & 0xFF
-            if key == 13:  # Enter key - play again
-                print("Restarting game...")
-                # Reset game state
-                player_hp = 100
-                mage_hp = 100
-                round_num = 1
-                game_display.return_to_idle()
-                break
-            elif key == ord('q'):  # Q key - quit
-                break
-        break
-    elif game_over_status == "mage":
-        print("\nThe mage has been defeated! YOU WIN!")
-        
-        # Set the defeat animation (user wins) before showing screen
-        game_display.start_defeat_animation()
-        
-        # Show victory screen
-        print("Showing victory screen...")
-        while True:
-            victory_display = game_display.create_win_defeat_screen("mage", player_hp, mage_hp, round_num)
-            cv2.imshow("Wizard Duel", victory_display)
-            
-            key = cv2.waitKey(8) & 0xFF
-            if key == 13:  # Enter key - play again
-                print("Restarting game...")
-                # Reset game state
-                player_hp = 100
-                mage_hp = 100
-                round_num = 1
-                game_display.return_to_idle()
-                break
-            elif key == ord('q'):  # Q key - quit
-                break
-        break
+            # Compose the screen for the (possibly new) phase
+            # Landmarks are drawn onto the camera inset, never onto the (possibly shared) camera frame
+            game_frame = session.render(img, scheduler.should_refresh())
+            profiler.mark("compose")
 
-    # Brief idle period between rounds (mage stays in idle)
-    print("Preparing for next round...")
-    idle_start_time = time.time()
-    idle_duration = 1.5  # 1.5 seconds of idle between attacks
-    
-    while time.time() - idle_start_time < idle_duration:
-        success, img = cap.read()
-        if not success:
-            print("Failed to grab frame during idle phase.")
-            break
-            
-        # Create idle display with preparation message
-        game_frame = game_display.create_game_display(
-            camera_frame=img,
-            player_hp=player_hp,
-            mage_hp=mage_hp,
-            round_num=round_num,
-            hand_landmarks=None,
-            mp_draw=mp_draw,
-            mp_hands=mp_hands
-        )
-        
-        # Add preparation message to the display
-        remaining_idle = idle_duration - (time.time() - idle_start_time)
-        cv2.putText(game_frame, f"Preparing for next round... ({remaining_idle:.1f}s)", (50, 200), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3, cv2.LINE_AA)
-        
-        # Use consistent window name
-        cv2.imshow("Wizard Duel", game_frame)
-        
-        # Use consistent frame timing (120 FPS)
-        key = cv2.waitKey(8) & 0xFF
-        if key == ord('q'):
-            player_hp = 0
-            break
-        
-        # Safety check to prevent infinite loop
-        if time.time() - idle_start_time > 5.0:  # Max 5 seconds
-            print("Idle phase timeout, continuing to next round...")
-            break
+            # Paced to the target frame rate by the scheduler
+            key = show_frame(game_frame, ticked_at)
+            profiler.end_frame()
+            if governor is not None:
+                level = governor.update(scheduler.work_time)
+                if level is not None:
+                    game_display.set_render_scale(level.render_scale)
+                    game_display.set_animation_fps(level.animation_fps)
+                    if pipeline is not None:
+                        pipeline.set_inference_fps(level.inference_fps)
+                    else:
+                        inference_interval = 1.0 / level.inference_fps if level.inference_fps else 0.0
 
-    print(f"Idle phase completed, starting round {round_num + 1}")
-    round_num += 1
+            if session.phase == READY:
+                if key != 0xFF:  # Any key starts the duel
+                    session.start(time.monotonic())
+                    duel_start_time = time.perf_counter()
+                    duel_start_frame = scheduler.frames
+            elif session.phase == GAME_OVER:
+                if key == 13:  # Enter key - play again
+                    session.restart(time.monotonic())
+                elif key == ord('q'):  # Q key - quit
+                    break
+            elif key == ord('q'):
+                session.forfeit()
+
+        if duel_start_time is not None:
+            duel_seconds = time.perf_counter() - duel_start_time
+            if duel_seconds > 0:
+                print(f"Measured frame rate with '{profile_name}' profile: "
+                      f"{(scheduler.frames - duel_start_frame) / duel_seconds:.1f} FPS")
+        if latency is not None and latency.latency() is not None:
+            print(f"Render latency (tick to imshow): {latency.latency() * 1000:.1f} ms, "
+                  f"reaction window allowance: {latency.allowance():.2f}s")
+        if governor is not None:
+            print(f"Quality level at exit: {governor.index} {governor.level}, {governor.changes} change(s)")
+        if pipeline is not None:
+            pipeline_stats = pipeline.stats()
+            print(f"Camera frames captured: {pipeline_stats['captured']}, "
+                  f"hand tracking results: {pipeline_stats['inferred']}")
+        else:
+            capture_stats = cap.stats()
+            print(f"Camera frames captured: {capture_stats['captured']}, dropped: {capture_stats['dropped']}")
+        if args.roi and pipeline is None:
+            roi_stats = hand_tracker.stats()
+            print(f"Hand tracking frames on ROI: {roi_stats['roi_frames']}, full frame: {roi_stats['full_frames']}")
+        return 0
+    finally:
+        profiler.print_summary()
+        if args.timings_out:
+            profiler.dump(args.timings_out)
+        if recorder is not None:
+            recorder.close()
+            print(f"Recorded {recorder.frames} frames to {recorder.path}")
+        # Release whatever finished loading, even if the player quit before it was used
+        cap = startup.completed("camera")
+        if cap is not None:
+            cap.release()
+        pipeline = startup.completed("pipeline")
+        if pipeline is not None:
+            pipeline.close()
+        hand_tracker = startup.completed("hand model")
+        if hand_tracker is not None:
+            hand_tracker.close()  # A HandRoiTracker closes both of its Hands instances
+        game_display = startup.completed("animations")
+        if game_display is not None:
+            game_display.cleanup()
+        startup.shutdown()
+        cv2.destroyAllWindows()
 
-cap.release()
-game_display.cleanup()
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    sys.exit(main())